@@ -2,9 +2,10 @@
 Kickoff Kings - Fantasy Football Website
 Flask backend application with Supabase, OpenAI, and Stripe integration
 """
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, g, render_template, jsonify, request, stream_with_context
 from flask_cors import CORS
 import pandas as pd
+import numpy as np
 from scraper import ESPNScraper
 from fantasy_calculator import FantasyPointsCalculator
 from prediction_model import FantasyPredictionModel
@@ -12,20 +13,64 @@ from config import Config
 from supabase_client import supabase_service
 from openai_service import openai_service
 from stripe_service import stripe_service
+import atexit
 import json
+import logging
+import orjson
+import hashlib
+import threading
+import time
+import traceback
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue, Empty
 from functools import wraps
+from itertools import islice
+from cachetools import TTLCache
+from jose import jwt, JWTError
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = Config.SECRET_KEY
 CORS(app, supports_credentials=True)
 
+# Log records are handed to a queue; a listener thread does the blocking writes to stderr.
+# werkzeug's request log is kept at INFO now that the root logger has a handler.
+log_queue = Queue()
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+logging.getLogger().addHandler(QueueHandler(log_queue))
+logging.getLogger('werkzeug').setLevel(logging.INFO)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 # Initialize components
 scraper = ESPNScraper()
 calculator = FantasyPointsCalculator()
 prediction_model = FantasyPredictionModel()
 
-# Cache for player data (fallback if Supabase not available)
-player_data_cache = None
+# Cached player data (fallback if Supabase not available) plus everything derived from it.
+# Snapshots are immutable: readers take one from player_cache.get(), loads publish a new one.
+PlayerSnapshot = namedtuple('PlayerSnapshot', 'players predictions predictions_json version')
+
+# Work kept off the draft pick response path (OpenAI analysis)
+background_executor = ThreadPoolExecutor(max_workers=8)
+
+# Draft session updates are written behind the pick response: (session_id, user_id, updates)
+draft_write_queue = Queue()
+DRAFT_WRITE_FLUSH_SECONDS = 1.0
+
+# ai_key -> (user_id, Future of the draft analysis, text streamed so far); unclaimed results expire
+ai_analysis_results = TTLCache(maxsize=1024, ttl=600)
+ai_analysis_results_lock = threading.Lock()
+
+# Verified tokens (keyed by SHA-256 of the token) -> (user, expiry timestamp or None)
+auth_token_cache = TTLCache(maxsize=1024, ttl=60)
+auth_token_cache_lock = threading.Lock()
+
+# Accepted league settings (the draft board is num_teams * roster_size picks)
+NUM_TEAMS_RANGE = (2, 32)
+ROSTER_SIZE_RANGE = (1, 30)
 
 # Helper function to verify Supabase auth token
 def verify_auth_token(token: str = None) -> dict:
@@ -36,13 +81,104 @@ def verify_auth_token(token: str = None) -> dict:
     if not token or not supabase_service.is_configured():
         return None
     
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    with auth_token_cache_lock:
+        cached = auth_token_cache.get(cache_key)
+    if cached is not None:
+        user, expires_at = cached
+        if expires_at is None or expires_at > time.time():
+            return user
+    
+    # Validate the JWT locally first; only ask Supabase if that is not possible
+    user, expires_at = decode_auth_token(token)
+    if user is None:
+        try:
+            # Verify token with Supabase
+            response = supabase_service.client.auth.get_user(token)
+            user = response.user.model_dump() if response and response.user else None
+        except Exception as e:
+            print(f"Error verifying token: {e}")
+            return None
+    
+    if user:
+        with auth_token_cache_lock:
+            auth_token_cache[cache_key] = (user, expires_at)
+    return user
+
+def decode_auth_token(token: str) -> tuple:
+    """Decode a Supabase JWT with the project secret; returns (user, exp) or (None, None)"""
+    if not Config.SUPABASE_JWT_SECRET:
+        return None, None
+    
     try:
-        # Verify token with Supabase
-        user = supabase_service.client.auth.get_user(token)
-        return user.user.model_dump() if user and user.user else None
-    except Exception as e:
-        print(f"Error verifying token: {e}")
+        claims = jwt.decode(
+            token,
+            Config.SUPABASE_JWT_SECRET,
+            algorithms=['HS256'],
+            audience='authenticated'
+        )
+    except JWTError:
+        return None, None
+    
+    if not claims.get('sub'):
+        return None, None
+    
+    user = {
+        'id': claims['sub'],
+        'email': claims.get('email'),
+        'role': claims.get('role'),
+        'user_metadata': claims.get('user_metadata', {}),
+        'app_metadata': claims.get('app_metadata', {})
+    }
+    return user, claims.get('exp')
+
+def json_response(payload: dict, status: int = 200) -> Response:
+    """Serialize a payload with orjson (numpy scalars included) into a JSON response"""
+    body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return Response(body, status=status, mimetype='application/json')
+
+def bounded_int(data: dict, key: str, default: int, low: int, high: int):
+    """Integer setting from a request body, or None if it is not an integer in [low, high]"""
+    try:
+        value = int(data.get(key, default))
+    except (TypeError, ValueError):
         return None
+    return value if low <= value <= high else None
+
+def error_response(e: Exception) -> tuple:
+    """500 JSON error response; the traceback is only formatted in development"""
+    payload = {'success': False, 'error': str(e)}
+    if Config.FLASK_ENV == 'development':
+        payload['traceback'] = traceback.format_exc()
+    return jsonify(payload), 500
+
+def records_fragment(df: pd.DataFrame) -> orjson.Fragment:
+    """Serialize a DataFrame as a JSON array of records in C, for embedding in a payload"""
+    return orjson.Fragment(df.to_json(orient='records'))
+
+def stream_players_response(df: pd.DataFrame, batch_size: int = 100, **fields) -> Response:
+    """Stream {'success', 'players', 'count', **fields} as JSON, encoding players in batches"""
+    columns = list(df.columns)
+    
+    def generate():
+        yield b'{"success":true,"players":['
+        rows = df.itertuples(index=False, name=None)
+        separator = b''
+        while True:
+            batch = [
+                orjson.dumps(dict(zip(columns, row)), option=orjson.OPT_SERIALIZE_NUMPY)
+                for row in islice(rows, batch_size)
+            ]
+            if not batch:
+                break
+            yield separator + b','.join(batch)
+            separator = b','
+        yield b'],"count":' + str(len(df)).encode()
+        for key, value in fields.items():
+            yield b',' + orjson.dumps(key) + b':' + orjson.dumps(value)
+        yield b'}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 def require_auth(f):
     """Decorator to require authentication"""
@@ -55,13 +191,20 @@ def require_auth(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def user_is_premium(user_id: str) -> bool:
+    """Check premium status at most once per request (the service keeps its own short cache)"""
+    request_memo = g.setdefault('premium_status', {})
+    if user_id not in request_memo:
+        request_memo[user_id] = supabase_service.is_user_premium(user_id)
+    return request_memo[user_id]
+
 def require_premium(f):
     """Decorator to require premium subscription"""
     @wraps(f)
     @require_auth
     def decorated_function(*args, **kwargs):
         user_id = request.current_user.get('id')
-        if not supabase_service.is_user_premium(user_id):
+        if not user_is_premium(user_id):
             return jsonify({'success': False, 'error': 'Premium subscription required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -74,42 +217,10 @@ def index():
 @app.route('/api/scrape', methods=['POST'])
 def scrape_data():
     """Scrape ESPN data and calculate fantasy points"""
-    global player_data_cache
-    
     try:
-        # Try to get from Supabase cache first
-        if supabase_service.is_configured():
-            cached_df = supabase_service.get_cached_players()
-            if cached_df is not None and len(cached_df) > 0:
-                player_data_cache = cached_df
-                result = cached_df.to_dict('records')
-                return jsonify({
-                    'success': True,
-                    'players': result,
-                    'count': len(result),
-                    'cached': True
-                })
-        
-        # Scrape data if not cached
-        df = scraper.scrape_player_stats()
-        
-        # Calculate fantasy points
-        df = calculator.calculate_points_for_dataframe(df)
-        
-        # Store in cache (both local and Supabase)
-        player_data_cache = df
-        if supabase_service.is_configured():
-            supabase_service.cache_players(df)
-        
-        # Convert to JSON
-        result = df.to_dict('records')
-        
-        return jsonify({
-            'success': True,
-            'players': result,
-            'count': len(result),
-            'cached': False
-        })
+        # Reload from the Supabase cache, or scrape ESPN if it is empty
+        snapshot, cached = player_cache.refresh()
+        return stream_players_response(snapshot.players, cached=cached)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -119,57 +230,30 @@ def scrape_data():
 @app.route('/api/predictions', methods=['GET', 'POST'])
 def get_predictions():
     """Get predicted points for all players for upcoming season"""
-    global player_data_cache
-    
     try:
-        if player_data_cache is None:
-            # Scrape if no cache
-            df = scraper.scrape_player_stats()
-            df = calculator.calculate_points_for_dataframe(df)
-            player_data_cache = df
-        
-        # Always use 17 games for next season predictions
-        games_played = 17
-        
-        # Generate predictions for upcoming season
-        df_with_predictions = prediction_model.predict_all_players(
-            player_data_cache, 
-            games_played
-        )
-        
-        # Add position rankings before sorting
-        df_with_predictions = add_position_rankings(df_with_predictions)
+        snapshot = player_cache.get()
         
-        # Sort by predicted points
-        df_with_predictions = df_with_predictions.sort_values(
-            'Predicted Points', 
-            ascending=False
-        )
-        
-        result = df_with_predictions.to_dict('records')
-        
-        return jsonify({
-            'success': True,
-            'players': result,
-            'count': len(result)
-        })
+        # Response bytes are built once per published snapshot
+        return Response(snapshot.predictions_json, mimetype='application/json')
     except Exception as e:
-        import traceback
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'traceback': traceback.format_exc()
-        }), 500
+        return error_response(e)
 
 @app.route('/api/draft-assistant', methods=['POST'])
 def draft_assistant():
     """Generate draft recommendations based on settings"""
-    global player_data_cache
-    
     try:
-        data = request.json
-        num_teams = int(data.get('num_teams', 12))
-        draft_position = int(data.get('draft_position', 1))
+        data = request.json or {}
+        num_teams = bounded_int(data, 'num_teams', 12, *NUM_TEAMS_RANGE)
+        roster_size = bounded_int(data, 'roster_size', 16, *ROSTER_SIZE_RANGE)
+        if num_teams is None or roster_size is None:
+            return jsonify({
+                'success': False,
+                'error': f'num_teams must be an integer from {NUM_TEAMS_RANGE[0]} to {NUM_TEAMS_RANGE[1]} '
+                         f'and roster_size from {ROSTER_SIZE_RANGE[0]} to {ROSTER_SIZE_RANGE[1]}'
+            }), 400
+        draft_position = bounded_int(data, 'draft_position', 1, 1, num_teams)
+        if draft_position is None:
+            return jsonify({'success': False, 'error': f'draft_position must be an integer from 1 to num_teams ({num_teams})'}), 400
         already_drafted = data.get('already_drafted', [])  # List of player names
         session_id = data.get('session_id')  # Optional: Supabase draft session ID
         user_id = None
@@ -179,41 +263,18 @@ def draft_assistant():
         if user:
             user_id = user.get('id')
         
-        if player_data_cache is None:
-            # Try Supabase cache first
-            if supabase_service.is_configured():
-                cached_df = supabase_service.get_cached_players()
-                if cached_df is not None and len(cached_df) > 0:
-                    player_data_cache = cached_df
-            
-            # Scrape if still no cache
-            if player_data_cache is None:
-                df = scraper.scrape_player_stats()
-                df = calculator.calculate_points_for_dataframe(df)
-                player_data_cache = df
-                if supabase_service.is_configured():
-                    supabase_service.cache_players(df)
-        
-        # Get predictions for next season (always 17 games)
-        games_played = 17
-        df_with_predictions = prediction_model.predict_all_players(
-            player_data_cache,
-            games_played
-        )
+        snapshot = player_cache.get()
         
-        # Filter out already drafted players
-        available_players = df_with_predictions[
-            ~df_with_predictions['Name'].isin(already_drafted)
-        ].copy()
+        # Get predictions for next season, already sorted by predicted points
+        df_with_predictions = snapshot.predictions
         
-        # Add position rankings
-        available_players = add_position_rankings(available_players)
+        # Predictions are sorted, so the top 20 available are the first 20 not yet drafted
+        available = available_mask(df_with_predictions['Name'], already_drafted)
+        top_available = df_with_predictions.iloc[np.flatnonzero(available)[:20]].copy()
         
-        # Sort by predicted points
-        available_players = available_players.sort_values(
-            'Predicted Points',
-            ascending=False
-        )
+        # Every available player ranked above a recommendation is itself a recommendation,
+        # so ranking the top rows gives position ranks among all available players
+        top_available = add_position_rankings(top_available)
         
         # Calculate draft round
         current_pick = len(already_drafted) + 1
@@ -221,20 +282,23 @@ def draft_assistant():
         pick_in_round = ((current_pick - 1) % num_teams) + 1
         
         # Generate recommendations (top 20 available)
-        recommendations = available_players.head(20).to_dict('records')
+        recommendations = top_available.to_dict('records')
+        
+        # The full snake draft board only goes to clients that ask for it (once per session)
+        include_draft_board = bool(data.get('include_draft_board'))
         
         # Save/update draft session if user is authenticated
         if user_id and supabase_service.is_configured():
             if session_id:
-                # Update existing session
-                supabase_service.update_draft_session(
+                # Update existing session (written behind; the response does not depend on it)
+                draft_write_queue.put((
                     session_id, user_id,
                     {
                         'already_drafted': already_drafted,
                         'num_teams': num_teams,
                         'draft_position': draft_position
                     }
-                )
+                ))
             else:
                 # Create new session
                 session_id = supabase_service.create_draft_session(
@@ -247,61 +311,217 @@ def draft_assistant():
             'current_pick': current_pick,
             'round_number': round_number,
             'pick_in_round': pick_in_round,
-            'total_available': len(available_players),
+            'total_available': int(available.sum()),
             'session_id': session_id
         }
+        if include_draft_board:
+            response_data['draft_board'] = snake_draft_board(num_teams, roster_size)
         
-        # Add OpenAI analysis if configured and user has premium
-        if openai_service.is_configured() and user_id and supabase_service.is_user_premium(user_id):
+        # Add OpenAI analysis if configured and user has premium; it runs in the
+        # background and the client polls /api/draft-assistant/ai/<ai_key> for it
+        if openai_service.is_configured() and user_id and user_is_premium(user_id):
             draft_context = {
                 'round_number': round_number,
                 'pick_in_round': pick_in_round,
                 'num_teams': num_teams,
                 'already_drafted': already_drafted
             }
-            analysis = openai_service.get_draft_analysis(recommendations, draft_context)
-            if analysis:
-                response_data['ai_analysis'] = analysis
+            ai_key = uuid.uuid4().hex
+            parts = []
+            future = background_executor.submit(
+                collect_draft_analysis, parts, recommendations, draft_context
+            )
+            with ai_analysis_results_lock:
+                ai_analysis_results[ai_key] = (user_id, future, parts)
+            response_data['ai_pending'] = True
+            response_data['ai_key'] = ai_key
         
-        return jsonify(response_data)
+        return json_response(response_data)
     except Exception as e:
-        import traceback
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'traceback': traceback.format_exc()
-        }), 500
+        return error_response(e)
 
-def add_position_rankings(df: pd.DataFrame) -> pd.DataFrame:
-    """Add position ranking to each player"""
-    df = df.copy()
-    df['Position Rank'] = 0
+@app.route('/api/draft-assistant/ai/<ai_key>', methods=['GET'])
+@require_auth
+def get_draft_ai_analysis(ai_key):
+    """Get the AI draft analysis started by a draft-assistant call"""
+    with ai_analysis_results_lock:
+        entry = ai_analysis_results.get(ai_key)
+    
+    if not entry or entry[0] != request.current_user.get('id'):
+        return jsonify({'success': False, 'error': 'Analysis not found'}), 404
+    
+    future, parts = entry[1], entry[2]
+    if not future.done():
+        # Text streamed so far, so the client can render it while generation continues
+        return jsonify({'success': True, 'ready': False, 'analysis': ''.join(parts) or None})
+    
+    analysis, complete = future.result()
+    return jsonify({
+        'success': True,
+        'ready': True,
+        'complete': complete,
+        'analysis': analysis
+    })
+
+def collect_draft_analysis(parts: list, recommendations: list, draft_context: dict) -> tuple:
+    """Stream the AI draft analysis into parts as it is generated; returns (text, complete)"""
+    try:
+        for content in openai_service.stream_draft_analysis(recommendations, draft_context):
+            parts.append(content)
+    except Exception:
+        # Keep what streamed before the failure, flagged as incomplete
+        return ''.join(parts) or None, False
+    return ''.join(parts) or None, True
+
+def drain_draft_writes():
+    """Write queued draft session updates, keeping only the latest one per session"""
+    while True:
+        batch = [draft_write_queue.get()]
+        
+        # Let a burst of picks collapse into one write per session
+        time.sleep(DRAFT_WRITE_FLUSH_SECONDS)
+        try:
+            while True:
+                batch.append(draft_write_queue.get_nowait())
+        except Empty:
+            pass
+        
+        latest_updates = {}
+        for session_id, user_id, updates in batch:
+            latest_updates[(session_id, user_id)] = updates
+        for (session_id, user_id), updates in latest_updates.items():
+            # An unexpected error must not stop this thread for good
+            try:
+                supabase_service.update_draft_session(session_id, user_id, updates)
+            except Exception as e:
+                print(f"Error writing draft session: {e}")
+
+threading.Thread(target=drain_draft_writes, daemon=True).start()
+
+class PlayerCache:
+    """Process-wide player data, loaded once and published as immutable snapshots"""
+    
+    def __init__(self):
+        self._snapshot = PlayerSnapshot(None, None, None, 0)
+        self._lock = threading.Lock()
+    
+    def get(self) -> PlayerSnapshot:
+        """Current snapshot, loading player data on first use"""
+        snapshot = self._snapshot
+        if snapshot.players is not None:
+            return snapshot
+        
+        with self._lock:
+            if self._snapshot.players is not None:
+                return self._snapshot
+            snapshot, cached = self._load()
+        
+        self._store(snapshot, cached)
+        return snapshot
+    
+    def refresh(self) -> tuple:
+        """Reload player data; returns (snapshot, whether it came from the Supabase cache)"""
+        with self._lock:
+            snapshot, cached = self._load()
+        
+        self._store(snapshot, cached)
+        return snapshot, cached
     
+    def _load(self) -> tuple:
+        """Load from the Supabase cache, or scrape ESPN if it is empty (caller holds the lock)"""
+        if supabase_service.is_configured():
+            cached_df = supabase_service.get_cached_players()
+            if cached_df is not None and len(cached_df) > 0:
+                return self._publish(compact_player_frame(cached_df)), True
+        
+        df = scraper.scrape_player_stats()
+        df = calculator.calculate_points_for_dataframe(df)
+        return self._publish(compact_player_frame(df)), False
+    
+    def _store(self, snapshot: PlayerSnapshot, cached: bool):
+        """Write freshly scraped data to Supabase (outside the lock, so readers are not held up)"""
+        if not cached and supabase_service.is_configured():
+            supabase_service.cache_players(snapshot.players)
+    
+    def _publish(self, df: pd.DataFrame) -> PlayerSnapshot:
+        """Build predictions and their JSON for new player data, then swap in a new snapshot"""
+        # Always use 17 games for next season predictions
+        predictions = prediction_model.predict_all_players(df, 17)
+        predictions = add_position_rankings(predictions)
+        predictions = predictions.sort_values('Predicted Points', ascending=False)
+        
+        predictions_json = orjson.dumps({
+            'success': True,
+            'players': records_fragment(predictions),
+            'count': len(predictions)
+        })
+        
+        self._snapshot = PlayerSnapshot(df, predictions, predictions_json, self._snapshot.version + 1)
+        return self._snapshot
+
+player_cache = PlayerCache()
+
+def available_mask(names: pd.Series, already_drafted: list) -> np.ndarray:
+    """Boolean mask of players whose name is not in already_drafted"""
+    if not isinstance(names.dtype, pd.CategoricalDtype):
+        return ~names.isin(already_drafted).to_numpy()
+    
+    # Look drafted names up in the category index once, then compare integer codes
+    drafted_codes = names.cat.categories.get_indexer(already_drafted)
+    return ~np.isin(names.cat.codes.to_numpy(), drafted_codes[drafted_codes >= 0])
+
+def add_position_rankings(df: pd.DataFrame) -> pd.DataFrame:
+    """Add position ranking to each player (modifies and returns the caller-owned frame)"""
     # Ensure Position column exists and fill NaN values
     if 'Position' not in df.columns:
         df['Position'] = 'UNK'
-    df['Position'] = df['Position'].fillna('UNK').astype(str)
+    if isinstance(df['Position'].dtype, pd.CategoricalDtype):
+        if df['Position'].isna().any():
+            if 'UNK' not in df['Position'].cat.categories:
+                df['Position'] = df['Position'].cat.add_categories('UNK')
+            df['Position'] = df['Position'].fillna('UNK')
+    else:
+        df['Position'] = df['Position'].fillna('UNK').astype(str)
     
     # Determine which column to use for ranking
     rank_column = 'Predicted Points' if 'Predicted Points' in df.columns else 'Fantasy Points'
     
-    # Filter out any NaN positions and get unique positions
-    valid_positions = df[df['Position'] != 'nan']['Position'].unique()
-    
-    for position in valid_positions:
-        if pd.isna(position) or position == 'nan':
-            continue
-        position_players = df[df['Position'] == position].copy()
-        if len(position_players) == 0:
-            continue
-        position_players = position_players.sort_values(
-            rank_column,
-            ascending=False
-        )
-        position_players['Position Rank'] = range(1, len(position_players) + 1)
-        
-        for idx, row in position_players.iterrows():
-            df.at[idx, 'Position Rank'] = row['Position Rank']
+    # Rank within each position in one vectorized pass (ties keep row order)
+    valid = df['Position'].ne('nan')
+    df['Position Rank'] = 0
+    df.loc[valid, 'Position Rank'] = (
+        df.loc[valid]
+        .groupby('Position', observed=True)[rank_column]
+        .rank(method='first', ascending=False)
+        .astype('int32')
+    )
+    
+    return df
+
+def snake_draft_board(num_teams: int, roster_size: int) -> dict:
+    """Round and drafting slot of every pick in a snake draft, indexed by overall pick - 1"""
+    picks = np.arange(num_teams * roster_size)
+    rounds = (picks // num_teams) + 1
+    slots = (picks % num_teams) + 1
+    # Even rounds run in reverse order
+    slots = np.where(rounds % 2 == 0, num_teams + 1 - slots, slots)
+    
+    return {
+        'num_teams': num_teams,
+        'roster_size': roster_size,
+        'round_number': rounds.tolist(),
+        'draft_slot': slots.tolist()
+    }
+
+def compact_player_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink the cached player frame: categorical Name/Position, downcast integer stat columns"""
+    for column in ('Name', 'Position'):
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    
+    # Float columns keep float64: float32 would serialize as values like 4.0999999046
+    for column in df.select_dtypes('int64').columns:
+        df[column] = pd.to_numeric(df[column], downcast='integer')
     
     return df
 
@@ -424,9 +644,11 @@ def get_current_user():
 @app.route('/api/draft-sessions', methods=['GET'])
 @require_auth
 def get_draft_sessions():
-    """Get all draft sessions for current user"""
+    """Get a page of draft sessions for current user (?limit=&offset=)"""
     user_id = request.current_user.get('id')
-    sessions = supabase_service.get_user_draft_sessions(user_id) if supabase_service.is_configured() else []
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    sessions = supabase_service.get_user_draft_sessions(user_id, limit, offset) if supabase_service.is_configured() else []
     
     return jsonify({
         'success': True,
@@ -2,6 +2,10 @@
 Configuration and environment variables
 """
 import os
+import atexit
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,6 +15,12 @@ class Config:
     SUPABASE_URL = os.getenv('SUPABASE_URL', '')
     SUPABASE_KEY = os.getenv('SUPABASE_KEY', '')
     SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY', '')
+    SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET', '')
+    SUPABASE_CACHE_BUCKET = os.getenv('SUPABASE_CACHE_BUCKET', 'cache')
+    # Rows per upsert request when caching players
+    CACHE_BATCH_SIZE = int(os.getenv('CACHE_BATCH_SIZE', '200'))
+    # Most open connections to the Supabase REST API
+    SUPABASE_POOL_MAX = int(os.getenv('SUPABASE_POOL_MAX', '50'))
     
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
@@ -26,4 +36,16 @@ class Config:
     
     # Subscription Settings
     PREMIUM_PRICE_ID = os.getenv('STRIPE_PREMIUM_PRICE_ID', '')
+    
+    # Shared outbound HTTP pools, so service calls reuse warm TCP/TLS connections.
+    # Reads get a longer timeout because chat completions can take a while.
+    SHARED_HTTP = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=httpx.Timeout(10.0, read=60.0)
+    )
+    SHARED_REQUESTS_SESSION = requests.Session()
+    SHARED_REQUESTS_SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
 
+atexit.register(Config.SHARED_HTTP.close)
+atexit.register(Config.SHARED_REQUESTS_SESSION.close)
@@ -3,6 +3,7 @@ Fantasy Football Points Calculator
 Calculates fantasy points based on ESPN's standard scoring rules
 """
 from typing import Dict
+import numpy as np
 import pandas as pd
 
 class FantasyPointsCalculator:
@@ -23,6 +24,16 @@ class FantasyPointsCalculator:
     - 200+ Yard Rushing/Receiving Game: 5 points
     """
     
+    # Stat columns used for scoring, in the column order _score_stats expects
+    _STAT_COLUMNS = (
+        'Passing Yds', 'Passing TD', 'Passing Sks',
+        'Rushing Yds', 'Rushing TD',
+        'Receiving Tgt', 'Receiving Yds', 'Receiving TD',
+        'Returns TD', 'FUM Lost', 'GP'
+    )
+    # Positions of Passing Yds, Rushing Yds and Receiving Yds in _STAT_COLUMNS
+    _BONUS_STAT_INDEX = [0, 3, 6]
+    
     def __init__(self):
         # Standard ESPN scoring rules
         self.scoring_rules = {
@@ -44,6 +55,26 @@ class FantasyPointsCalculator:
             'receiving_100_199_bonus': 3,
             'receiving_200_bonus': 5,
         }
+        
+        # Points per unit of each linear stat, in _STAT_COLUMNS order (GP has none)
+        rules = self.scoring_rules
+        self._coef = np.array([
+            1.0 / rules['passing_yds_per_point'], rules['passing_td'], -1,  # -1 point per sack
+            1.0 / rules['rushing_yds_per_point'], rules['rushing_td'],
+            # Estimate receptions from targets (roughly 65% catch rate)
+            0.65 * rules['reception'], 1.0 / rules['receiving_yds_per_point'], rules['receiving_td'],
+            rules['return_td'], rules['fumble_lost']
+        ], dtype=np.float32)
+        
+        # Milestone bonus rules for passing, rushing and receiving yards per game
+        self._bonus_low = np.array([300, 100, 100], dtype=np.float32)
+        self._bonus_high = np.array([400, 200, 200], dtype=np.float32)
+        self._bonus_low_points = np.array([
+            rules['passing_300_399_bonus'], rules['rushing_100_199_bonus'], rules['receiving_100_199_bonus']
+        ], dtype=np.float32)
+        self._bonus_high_points = np.array([
+            rules['passing_400_bonus'], rules['rushing_200_bonus'], rules['receiving_200_bonus']
+        ], dtype=np.float32)
     
     def calculate_player_points(self, player_stats: Dict) -> float:
         """
@@ -55,47 +86,40 @@ class FantasyPointsCalculator:
         Returns:
             Total fantasy points
         """
-        points = 0.0
+        # Read every stat once; missing, None and NaN all count as 0
+        (passing_yds, passing_td, passing_sks, rushing_yds, rushing_td,
+         receiving_tgt, receiving_yds, receiving_td, returns_td, fum_lost, gp) = [
+            0.0 if (value := player_stats.get(key)) is None or value != value else float(value)
+            for key in self._STAT_COLUMNS
+        ]
+        rules = self.scoring_rules
         
         # Passing statistics
-        passing_yds = player_stats.get('Passing Yds', 0) or 0
-        passing_td = player_stats.get('Passing TD', 0) or 0
-        passing_sks = player_stats.get('Passing Sks', 0) or 0
-        
-        points += passing_yds / self.scoring_rules['passing_yds_per_point']
-        points += passing_td * self.scoring_rules['passing_td']
+        points = passing_yds / rules['passing_yds_per_point']
+        points += passing_td * rules['passing_td']
         points += passing_sks * -1  # -1 point per sack
         
         # Note: Interceptions not in provided stats, would need to be added
         
         # Rushing statistics
-        rushing_yds = player_stats.get('Rushing Yds', 0) or 0
-        rushing_td = player_stats.get('Rushing TD', 0) or 0
-        
-        points += rushing_yds / self.scoring_rules['rushing_yds_per_point']
-        points += rushing_td * self.scoring_rules['rushing_td']
+        points += rushing_yds / rules['rushing_yds_per_point']
+        points += rushing_td * rules['rushing_td']
         
         # Receiving statistics
-        receiving_tgt = player_stats.get('Receiving Tgt', 0) or 0
-        receiving_yds = player_stats.get('Receiving Yds', 0) or 0
-        receiving_td = player_stats.get('Receiving TD', 0) or 0
-        
         # Estimate receptions from targets (roughly 65% catch rate)
         receptions = receiving_tgt * 0.65
-        points += receptions * self.scoring_rules['reception']
-        points += receiving_yds / self.scoring_rules['receiving_yds_per_point']
-        points += receiving_td * self.scoring_rules['receiving_td']
+        points += receptions * rules['reception']
+        points += receiving_yds / rules['receiving_yds_per_point']
+        points += receiving_td * rules['receiving_td']
         
         # Return touchdowns
-        returns_td = player_stats.get('Returns TD', 0) or 0
-        points += returns_td * self.scoring_rules['return_td']
+        points += returns_td * rules['return_td']
         
         # Fumbles lost
-        fum_lost = player_stats.get('FUM Lost', 0) or 0
-        points += fum_lost * self.scoring_rules['fumble_lost']
+        points += fum_lost * rules['fumble_lost']
         
-        # Bonus points for milestone games
-        gp = player_stats.get('GP', 1) or 1
+        # Bonus points for milestone games (a GP of 0 counts as 1)
+        gp = gp or 1
         if gp > 0:
             avg_passing_yds = passing_yds / gp
             avg_rushing_yds = rushing_yds / gp
@@ -103,21 +127,21 @@ class FantasyPointsCalculator:
             
             # Passing bonuses (per game average)
             if 300 <= avg_passing_yds < 400:
-                points += self.scoring_rules['passing_300_399_bonus'] * gp
+                points += rules['passing_300_399_bonus'] * gp
             elif avg_passing_yds >= 400:
-                points += self.scoring_rules['passing_400_bonus'] * gp
+                points += rules['passing_400_bonus'] * gp
             
             # Rushing bonuses
             if 100 <= avg_rushing_yds < 200:
-                points += self.scoring_rules['rushing_100_199_bonus'] * gp
+                points += rules['rushing_100_199_bonus'] * gp
             elif avg_rushing_yds >= 200:
-                points += self.scoring_rules['rushing_200_bonus'] * gp
+                points += rules['rushing_200_bonus'] * gp
             
             # Receiving bonuses
             if 100 <= avg_receiving_yds < 200:
-                points += self.scoring_rules['receiving_100_199_bonus'] * gp
+                points += rules['receiving_100_199_bonus'] * gp
             elif avg_receiving_yds >= 200:
-                points += self.scoring_rules['receiving_200_bonus'] * gp
+                points += rules['receiving_200_bonus'] * gp
         
         return round(points, 2)
     
@@ -131,10 +155,46 @@ class FantasyPointsCalculator:
         Returns:
             DataFrame with added 'Fantasy Points' column
         """
-        df = df.copy()
-        df['Fantasy Points'] = df.apply(
-            lambda row: self.calculate_player_points(row.to_dict()),
-            axis=1
+        # Shallow copy: the new column is added without copying the stat columns
+        df = df.copy(deep=False)
+        
+        # Missing or non-numeric stats count as 0 (a GP of 0 is scored as 1 game)
+        stats = df.reindex(columns=list(self._STAT_COLUMNS), fill_value=0)
+        df['Fantasy Points'] = self._score_stats(
+            np.column_stack([self._to_float32(stats[name]) for name in self._STAT_COLUMNS])
         )
         return df
-
+    
+    @staticmethod
+    def _to_float32(series: pd.Series) -> np.ndarray:
+        """Stat column as float32, with text such as '--' and missing values as 0"""
+        return pd.to_numeric(series, errors='coerce').fillna(0).to_numpy(dtype=np.float32)
+    
+    def _score_stats(self, stats: np.ndarray) -> np.ndarray:
+        """
+        Score many players at once; same rules as calculate_player_points
+        
+        Args:
+            stats: 2-D float32 array, one row per player and one column per _STAT_COLUMNS entry
+            
+        Returns:
+            float64 array of fantasy points rounded to 2 decimals
+        """
+        # Linear part: one matrix-vector product over every stat but GP (float32 halves
+        # the memory traffic; totals only need 2 decimals)
+        points = stats[:, :-1] @ self._coef
+        
+        # Bonus points for milestone games, from per game averages (GP of 0 counts as 1)
+        gp = stats[:, -1]
+        gp = np.where(gp == 0, np.float32(1), gp)
+        games = np.maximum(gp, np.float32(1))
+        
+        # All three yardage rules at once: (players x rules) averages against per-rule bounds.
+        # Divide rather than multiply by 1/GP, so exact averages such as 300.0 stay exact
+        avg_yds = stats[:, self._BONUS_STAT_INDEX] / games[:, None]
+        bonus = np.where(avg_yds >= self._bonus_high, self._bonus_high_points,
+                         np.where(avg_yds >= self._bonus_low, self._bonus_low_points, np.float32(0)))
+        points += np.where(gp > 0, bonus.sum(axis=1) * gp, np.float32(0))
+        
+        # float32 is plenty for 2 decimals; round in float64 so serialized values stay exact
+        return np.round(points.astype(np.float64), 2)
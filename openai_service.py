@@ -3,16 +3,47 @@ OpenAI service for enhanced draft recommendations
 """
 from openai import OpenAI
 from config import Config
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
+from cachetools import TTLCache
 import json
+import threading
 
 class OpenAIService:
     """Service class for OpenAI operations"""
     
+    # Fixed prompt parts, built once
+    _ANALYSIS_SYSTEM_MESSAGE = {
+        "role": "system",
+        "content": "You are a helpful fantasy football draft expert. Provide concise, actionable advice."
+    }
+    _ANALYSIS_PROMPT = """You are a fantasy football expert. Analyze these draft recommendations and provide strategic advice.
+
+Draft Context:
+- Round: {round_number}
+- Pick in Round: {pick_in_round}
+- Total Teams: {num_teams}
+- Already Drafted: {drafted_count} players
+
+Top Recommendations:
+{players_text}
+
+Provide:
+1. Which player(s) to target and why
+2. Position strategy for this round
+3. Any sleepers or value picks
+4. What positions to avoid right now
+
+Keep the analysis concise (2-3 paragraphs) and actionable."""
+    
     def __init__(self):
         self.client = None
         if Config.OPENAI_API_KEY:
-            self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+            self.client = OpenAI(api_key=Config.OPENAI_API_KEY, http_client=Config.SHARED_HTTP)
+        
+        # Completed responses keyed by everything that goes into the prompt; entries
+        # expire after an hour so model updates are picked up
+        self._response_cache = TTLCache(maxsize=256, ttl=3600)
+        self._response_cache_lock = threading.Lock()
     
     def is_configured(self) -> bool:
         """Check if OpenAI is configured"""
@@ -29,50 +60,85 @@ class OpenAIService:
         Returns:
             Analysis text or None
         """
-        if not self.is_configured():
+        try:
+            parts = list(self.stream_draft_analysis(recommendations, draft_context))
+        except Exception:
             return None
+        return ''.join(parts) if parts else None
+    
+    def stream_draft_analysis(self, recommendations: List[Dict], draft_context: Dict) -> Iterator[str]:
+        """
+        Stream AI-powered draft analysis as it is generated
         
+        Args:
+            recommendations: List of player recommendations
+            draft_context: Dict with draft context (round, pick, position_needs, etc.)
+        
+        Returns:
+            Iterator of text pieces (a cached analysis comes back as one piece)
+        
+        Raises:
+            The OpenAI error if the request or stream fails, so a partial analysis is not taken as complete
+        """
+        if not self.is_configured():
+            return
+        
+        top_players = recommendations[:10]  # Top 10 recommendations
+        cache_key = (
+            'analysis',
+            tuple(
+                (p.get('Name'), p.get('Position'), round(p.get('Predicted Points', 0), 1))
+                for p in top_players
+            ),
+            draft_context.get('round_number'),
+            draft_context.get('pick_in_round'),
+            draft_context.get('num_teams'),
+            len(draft_context.get('already_drafted', []))
+        )
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
         try:
             # Build prompt
-            top_players = recommendations[:10]  # Top 10 recommendations
-            players_text = "\n".join([
+            players_text = "\n".join(
                 f"{i+1}. {p.get('Name', 'N/A')} ({p.get('Position', 'N/A')}) - {p.get('Predicted Points', 0):.1f} pts"
                 for i, p in enumerate(top_players)
-            ])
+            )
             
-            prompt = f"""You are a fantasy football expert. Analyze these draft recommendations and provide strategic advice.
-
-Draft Context:
-- Round: {draft_context.get('round_number', 'N/A')}
-- Pick in Round: {draft_context.get('pick_in_round', 'N/A')}
-- Total Teams: {draft_context.get('num_teams', 'N/A')}
-- Already Drafted: {len(draft_context.get('already_drafted', []))} players
-
-Top Recommendations:
-{players_text}
-
-Provide:
-1. Which player(s) to target and why
-2. Position strategy for this round
-3. Any sleepers or value picks
-4. What positions to avoid right now
-
-Keep the analysis concise (2-3 paragraphs) and actionable."""
+            prompt = self._ANALYSIS_PROMPT.format(
+                round_number=draft_context.get('round_number', 'N/A'),
+                pick_in_round=draft_context.get('pick_in_round', 'N/A'),
+                num_teams=draft_context.get('num_teams', 'N/A'),
+                drafted_count=len(draft_context.get('already_drafted', [])),
+                players_text=players_text
+            )
 
-            response = self.client.chat.completions.create(
+            # Tight token cap, a stop at long gaps and low temperature keep generation short
+            stream = self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
-                    {"role": "system", "content": "You are a helpful fantasy football draft expert. Provide concise, actionable advice."},
+                    self._ANALYSIS_SYSTEM_MESSAGE,
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=400,
-                temperature=0.7
+                max_tokens=350,
+                temperature=0.5,
+                stop=["\n\n\n"],
+                stream=True
             )
             
-            return response.choices[0].message.content
+            for chunk in stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    parts.append(content)
+                    yield content
         except Exception as e:
             print(f"Error getting OpenAI analysis: {e}")
-            return None
+            raise
+        
+        self._cache_response(cache_key, ''.join(parts) if parts else None)
     
     def get_personalized_draft_strategy(self, draft_history: List[str], num_teams: int, draft_position: int) -> Optional[str]:
         """
@@ -89,6 +155,11 @@ Keep the analysis concise (2-3 paragraphs) and actionable."""
         if not self.is_configured():
             return None
         
+        cache_key = ('strategy', tuple(draft_history), num_teams, draft_position)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = f"""Based on this fantasy football draft situation, provide a draft strategy:
 
@@ -113,10 +184,22 @@ Keep it actionable and specific to this draft situation."""
                 temperature=0.7
             )
             
-            return response.choices[0].message.content
+            return self._cache_response(cache_key, response.choices[0].message.content)
         except Exception as e:
             print(f"Error getting draft strategy: {e}")
             return None
+    
+    def _get_cached_response(self, cache_key: tuple) -> Optional[str]:
+        """Get a cached completion, if one is still fresh"""
+        with self._response_cache_lock:
+            return self._response_cache.get(cache_key)
+    
+    def _cache_response(self, cache_key: tuple, content: Optional[str]) -> Optional[str]:
+        """Cache a completion (failures are not cached) and return it"""
+        if content is not None:
+            with self._response_cache_lock:
+                self._response_cache[cache_key] = content
+        return content
 
 # Global instance
 openai_service = OpenAIService()
@@ -7,7 +7,7 @@ import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 from typing import Dict, List
-import pickle
+import json
 import os
 
 class FantasyPredictionModel:
@@ -21,6 +21,12 @@ class FantasyPredictionModel:
         self.scaler = StandardScaler()
         self.is_trained = False
         self.historical_data = []
+        
+        # historical_data[:_combined_seasons] already concatenated, so retraining only
+        # appends new seasons; _trained_seasons is how many the averages were built from
+        self._combined = None
+        self._combined_seasons = 0
+        self._trained_seasons = None
     
     def add_historical_season(self, season_data: pd.DataFrame, season_year: int):
         """
@@ -43,48 +49,51 @@ class FantasyPredictionModel:
             self.is_trained = False
             return
         
-        # Combine all historical seasons
-        all_data = pd.concat(self.historical_data, ignore_index=True)
+        # Nothing added since the last training
+        if self.is_trained and self._trained_seasons == len(self.historical_data):
+            return
         
-        # Group by player and calculate averages/trends
-        player_stats = []
+        # Combine all historical seasons, appending only those not combined yet
+        new_seasons = self.historical_data[self._combined_seasons:]
+        if new_seasons:
+            pieces = new_seasons if self._combined is None else [self._combined] + new_seasons
+            self._combined = pd.concat(pieces, ignore_index=True)
+            self._combined_seasons = len(self.historical_data)
+        all_data = self._combined
         
-        for name in all_data['Name'].unique():
-            player_data = all_data[all_data['Name'] == name].copy()
-            
-            if len(player_data) < 1:
-                continue
-            
-            # Calculate average stats per game
-            avg_stats = {
-                'Name': name,
-                'Position': player_data['Position'].iloc[0] if 'Position' in player_data.columns else 'UNK',
-                'Team': player_data['Team'].iloc[0] if 'Team' in player_data.columns else 'UNK',
-            }
-            
-            # Average per game stats
-            for stat in ['Passing Yds', 'Passing TD', 'Rushing Yds', 'Rushing TD',
-                         'Receiving Yds', 'Receiving TD', 'Receiving Tgt', 'Fantasy Points']:
-                if stat in player_data.columns:
-                    total = player_data[stat].sum()
-                    total_gp = player_data['GP'].sum()
-                    if total_gp > 0:
-                        avg_stats[f'Avg_{stat}_per_game'] = total / total_gp
-                    else:
-                        avg_stats[f'Avg_{stat}_per_game'] = 0
-            
-            # Calculate trend (improving or declining)
-            if len(player_data) > 1 and 'Fantasy Points' in player_data.columns:
-                recent_points = player_data['Fantasy Points'].iloc[-1]
-                older_points = player_data['Fantasy Points'].iloc[0]
-                avg_stats['Trend'] = recent_points - older_points
-            else:
-                avg_stats['Trend'] = 0
-            
-            player_stats.append(avg_stats)
+        all_data = all_data[all_data['Name'].notna()]
+        
+        # Group by player and calculate averages/trends in one pass, indexed by Name
+        # (every per-player result is aligned to the order players first appear)
+        grouped = all_data.groupby('Name', sort=False, observed=True)
+        first_rows = all_data.drop_duplicates('Name').set_index('Name')
+        names = first_rows.index
+        averages = pd.DataFrame(index=pd.Index(names.astype(object), name='Name'))
+        for column in ('Position', 'Team'):
+            averages[column] = first_rows[column].to_numpy() if column in all_data.columns else 'UNK'
         
-        self.player_averages = pd.DataFrame(player_stats)
+        # Average per game stats
+        stats = [stat for stat in ['Passing Yds', 'Passing TD', 'Rushing Yds', 'Rushing TD',
+                                   'Receiving Yds', 'Receiving TD', 'Receiving Tgt', 'Fantasy Points']
+                 if stat in all_data.columns]
+        sums = grouped[stats + ['GP']].sum().reindex(names)
+        total_gp = sums['GP'].to_numpy(dtype=np.float64)
+        for stat in stats:
+            per_game = sums[stat].to_numpy(dtype=np.float64) / np.where(total_gp > 0, total_gp, 1)
+            averages[f'Avg_{stat}_per_game'] = np.where(total_gp > 0, per_game, 0)
+        
+        # Calculate trend (improving or declining): last season minus first season
+        if 'Fantasy Points' in all_data.columns:
+            last_rows = all_data.drop_duplicates('Name', keep='last').set_index('Name').reindex(names)
+            trend = last_rows['Fantasy Points'].to_numpy() - first_rows['Fantasy Points'].to_numpy()
+            seasons = grouped.size().reindex(names).to_numpy()
+            averages['Trend'] = np.where(seasons > 1, trend, 0)
+        else:
+            averages['Trend'] = 0
+        
+        self.player_averages = averages
         self.is_trained = True
+        self._trained_seasons = len(self.historical_data)
     
     def predict_points(self, player_name: str, games_played: int = 17) -> float:
         """
@@ -97,11 +106,11 @@ class FantasyPredictionModel:
         Returns:
             Predicted fantasy points
         """
-        if not self.is_trained or player_name not in self.player_averages['Name'].values:
+        if not self.is_trained or player_name not in self.player_averages.index:
             # Fallback: use simple projection based on position averages
             return self._predict_by_position_average(player_name, games_played)
         
-        player_data = self.player_averages[self.player_averages['Name'] == player_name].iloc[0]
+        player_data = self.player_averages.loc[player_name]
         
         # Base prediction on average per game
         avg_points_per_game = player_data.get('Avg_Fantasy Points_per_game', 0)
@@ -125,12 +134,21 @@ class FantasyPredictionModel:
         Returns:
             DataFrame with predicted points added
         """
-        df = current_season_data.copy()
+        # Shallow copy: the new column is added without copying the stat columns
+        df = current_season_data.copy(deep=False)
         
         if self.is_trained:
-            df['Predicted Points'] = df['Name'].apply(
-                lambda name: self.predict_points(name, games_played)
-            )
+            # Look every player's averages up at once; unknown players get the fallback
+            names = df['Name'].to_numpy(dtype=object)
+            known = self.player_averages.index.get_indexer(names) >= 0
+            averages = self.player_averages.reindex(names)
+            avg_points_per_game = averages.get('Avg_Fantasy Points_per_game', 0)
+            trend_adjustment = averages['Trend'] * 0.1  # 10% of trend
+            
+            # Project for full season
+            predicted = (avg_points_per_game + trend_adjustment).to_numpy(dtype=np.float64) * games_played
+            fallback = self._predict_by_position_average(None, games_played)
+            df['Predicted Points'] = np.where(known, np.fmax(np.round(predicted, 2), 0), fallback)
         else:
             # Use current season data as baseline
             if 'Fantasy Points' in df.columns:
@@ -156,19 +174,24 @@ class FantasyPredictionModel:
         return position_averages.get('QB', 200) * (games_played / 17)
     
     def save_model(self, filepath: str):
-        """Save the trained model"""
-        model_data = {
-            'player_averages': self.player_averages if self.is_trained else None,
-            'is_trained': self.is_trained
-        }
-        with open(filepath, 'wb') as f:
-            pickle.dump(model_data, f)
+        """Save the trained model (averages as zstd Parquet, flags in a .meta.json sidecar)"""
+        if self.is_trained:
+            averages = self.player_averages.copy()
+            for column in ('Position', 'Team'):
+                if column in averages.columns:
+                    averages[column] = averages[column].astype('category')
+            averages.to_parquet(filepath, engine='pyarrow', compression='zstd')
+        
+        with open(f'{filepath}.meta.json', 'w') as f:
+            json.dump({'is_trained': self.is_trained}, f)
     
     def load_model(self, filepath: str):
         """Load a saved model"""
-        if os.path.exists(filepath):
-            with open(filepath, 'rb') as f:
-                model_data = pickle.load(f)
-                self.player_averages = model_data.get('player_averages')
-                self.is_trained = model_data.get('is_trained', False)
-
+        meta_path = f'{filepath}.meta.json'
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                model_data = json.load(f)
+            self.is_trained = model_data.get('is_trained', False) and os.path.exists(filepath)
+            if self.is_trained:
+                self.player_averages = pd.read_parquet(filepath, engine='pyarrow')
+                self._trained_seasons = None
@@ -5,10 +5,28 @@ Scrapes player data from ESPN's NFL stats page
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
+import numpy as np
 import time
 import re
 from typing import List, Dict
 
+# Sample data for development/testing: 50 players, 10 QBs, 15 RBs, 15 WRs, 10 TEs.
+# Numeric columns are typed arrays built once at import, not re-inferred per call.
+_SAMPLE_NAMES = ['Patrick Mahomes', 'Josh Allen', 'Lamar Jackson', 'Jalen Hurts', 'Dak Prescott', 'Joe Burrow', 'Justin Herbert', 'Trevor Lawrence', 'Tua Tagovailoa', 'Brock Purdy', 'Christian McCaffrey', 'Derrick Henry', 'Saquon Barkley', 'Josh Jacobs', 'Austin Ekeler', 'Alvin Kamara', 'Tony Pollard', 'Rhamondre Stevenson', 'Travis Etienne', 'Breece Hall', 'Joe Mixon', 'Aaron Jones', 'James Cook', 'Isiah Pacheco', 'Kenneth Walker', 'Tyreek Hill', 'CeeDee Lamb', 'Amon-Ra St. Brown', 'Mike Evans', 'Stefon Diggs', 'Keenan Allen', 'Davante Adams', 'A.J. Brown', 'Deebo Samuel', 'Jaylen Waddle', 'Terry McLaurin', 'DK Metcalf', 'Calvin Ridley', 'DeAndre Hopkins', 'Cooper Kupp', 'Travis Kelce', 'Mark Andrews', 'T.J. Hockenson', 'George Kittle', 'Sam LaPorta', 'Evan Engram', 'David Njoku', 'Kyle Pitts', 'Dalton Schultz', 'Trey McBride']
+_SAMPLE_TEAMS = ['KC', 'BUF', 'BAL', 'PHI', 'DAL', 'CIN', 'LAC', 'JAX', 'MIA', 'SF', 'SF', 'TEN', 'NYG', 'GB', 'LAC', 'NO', 'DAL', 'NE', 'JAX', 'NYJ', 'CIN', 'GB', 'BUF', 'KC', 'SEA', 'MIA', 'DAL', 'DET', 'TB', 'BUF', 'LAC', 'LV', 'PHI', 'SF', 'MIA', 'WAS', 'SEA', 'TEN', 'TEN', 'LAR', 'KC', 'BAL', 'MIN', 'SF', 'DET', 'JAX', 'CLE', 'ATL', 'HOU', 'ARI']
+_SAMPLE_POSITIONS = np.repeat(['QB', 'RB', 'WR', 'TE'], [10, 15, 15, 10])
+_SAMPLE_GP = np.array([17, 17, 16, 17, 17, 10, 13, 16, 16, 16, 16, 17, 14, 13, 14, 13, 17, 12, 17, 17, 17, 11, 17, 16, 15, 16, 17, 16, 17, 17, 13, 17, 16, 15, 12, 17, 16, 17, 17, 12, 15, 10, 15, 16, 17, 17, 16, 17, 15, 17], dtype=np.int32)
+_SAMPLE_PASSING_YDS = np.array([4183, 4306, 3218, 3858, 4516, 2309, 3104, 4006, 4624, 4280] + [0] * 40, dtype=np.int32)
+_SAMPLE_PASSING_TD = np.array([27, 29, 24, 23, 36, 15, 20, 21, 29, 31] + [0] * 40, dtype=np.int32)
+_SAMPLE_PASSING_SKS = np.array([27, 24, 29, 38, 30, 22, 29, 35, 31, 28] + [0] * 40, dtype=np.int32)
+_SAMPLE_RUSHING_YDS = np.array([389, 524, 821, 605, 242, 88, 228, 339, 74, 144, 1014, 1167, 962, 805, 628, 694, 1006, 619, 1120, 994, 1034, 656, 1122, 935, 905] + [0] * 25, dtype=np.int32)
+_SAMPLE_RUSHING_TD = np.array([4, 15, 5, 15, 2, 4, 4, 4, 1, 2, 14, 12, 6, 6, 5, 5, 6, 4, 11, 5, 9, 2, 16, 7, 8] + [0] * 25, dtype=np.int32)
+_SAMPLE_RECEIVING_TGT = np.array([0] * 10 + [83, 33, 60, 44, 74, 75, 55, 69, 58, 76, 64, 30, 48, 57, 27, 171, 181, 164, 136, 107, 150, 175, 158, 97, 95, 130, 119, 136, 75, 95, 93, 61, 95, 65, 120, 114, 89, 90, 88, 81], dtype=np.int32)
+_SAMPLE_RECEIVING_YDS = np.array([0] * 10 + [564, 214, 280, 296, 436, 466, 311, 238, 476, 591, 376, 233, 280, 345, 259, 1799, 1749, 1515, 1255, 1075, 1243, 1144, 1456, 1057, 737, 1051, 1122, 1016, 1057, 737, 984, 544, 960, 1020, 889, 1144, 882, 667, 635, 825], dtype=np.int32)
+_SAMPLE_RECEIVING_TD = np.array([0] * 10 + [7, 0, 4, 1, 1, 5, 0, 4, 1, 4, 4, 1, 0, 5, 1, 13, 12, 10, 13, 8, 7, 8, 7, 5, 5, 4, 8, 8, 7, 5, 5, 6, 5, 6, 10, 4, 3, 3, 5, 3], dtype=np.int32)
+_SAMPLE_RETURNS_TD = np.zeros(50, dtype=np.int32)
+_SAMPLE_FUM_LOST = np.array([3, 4, 6, 3, 2, 2, 3, 4, 2, 1, 1, 2, 1, 1, 2, 1, 1, 1, 2, 1, 1, 1, 1, 1, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0], dtype=np.int32)
+
 class ESPNScraper:
     def __init__(self):
         self.base_url = "https://www.espn.com/nfl/stats"
@@ -27,27 +45,21 @@ class ESPNScraper:
     
     def _get_sample_data(self) -> pd.DataFrame:
         """Return sample data structure for development/testing"""
-        # 50 players: 10 QBs, 15 RBs, 15 WRs, 10 TEs
-        data = {
-            'Name': ['Patrick Mahomes', 'Josh Allen', 'Lamar Jackson', 'Jalen Hurts', 'Dak Prescott', 'Joe Burrow', 'Justin Herbert', 'Trevor Lawrence', 'Tua Tagovailoa', 'Brock Purdy', 'Christian McCaffrey', 'Derrick Henry', 'Saquon Barkley', 'Josh Jacobs', 'Austin Ekeler', 'Alvin Kamara', 'Tony Pollard', 'Rhamondre Stevenson', 'Travis Etienne', 'Breece Hall', 'Joe Mixon', 'Aaron Jones', 'James Cook', 'Isiah Pacheco', 'Kenneth Walker', 'Tyreek Hill', 'CeeDee Lamb', 'Amon-Ra St. Brown', 'Mike Evans', 'Stefon Diggs', 'Keenan Allen', 'Davante Adams', 'A.J. Brown', 'Deebo Samuel', 'Jaylen Waddle', 'Terry McLaurin', 'DK Metcalf', 'Calvin Ridley', 'DeAndre Hopkins', 'Cooper Kupp', 'Travis Kelce', 'Mark Andrews', 'T.J. Hockenson', 'George Kittle', 'Sam LaPorta', 'Evan Engram', 'David Njoku', 'Kyle Pitts', 'Dalton Schultz', 'Trey McBride'],
-            'Team': ['KC', 'BUF', 'BAL', 'PHI', 'DAL', 'CIN', 'LAC', 'JAX', 'MIA', 'SF', 'SF', 'TEN', 'NYG', 'GB', 'LAC', 'NO', 'DAL', 'NE', 'JAX', 'NYJ', 'CIN', 'GB', 'BUF', 'KC', 'SEA', 'MIA', 'DAL', 'DET', 'TB', 'BUF', 'LAC', 'LV', 'PHI', 'SF', 'MIA', 'WAS', 'SEA', 'TEN', 'TEN', 'LAR', 'KC', 'BAL', 'MIN', 'SF', 'DET', 'JAX', 'CLE', 'ATL', 'HOU', 'ARI'],
-            'Position': ['QB'] * 10 + ['RB'] * 15 + ['WR'] * 15 + ['TE'] * 10,
-            'GP': [17, 17, 16, 17, 17, 10, 13, 16, 16, 16, 16, 17, 14, 13, 14, 13, 17, 12, 17, 17, 17, 11, 17, 16, 15, 16, 17, 16, 17, 17, 13, 17, 16, 15, 12, 17, 16, 17, 17, 12, 15, 10, 15, 16, 17, 17, 16, 17, 15, 17],
-            'Passing Yds': [4183, 4306, 3218, 3858, 4516, 2309, 3104, 4006, 4624, 4280] + [0] * 40,
-            'Passing TD': [27, 29, 24, 23, 36, 15, 20, 21, 29, 31] + [0] * 40,
-            'Passing Sks': [27, 24, 29, 38, 30, 22, 29, 35, 31, 28] + [0] * 40,
-            'Rushing Yds': [389, 524, 821, 605, 242, 88, 228, 339, 74, 144, 1014, 1167, 962, 805, 628, 694, 1006, 619, 1120, 994, 1034, 656, 1122, 935, 905] + [0] * 25,
-            'Rushing TD': [4, 15, 5, 15, 2, 4, 4, 4, 1, 2, 14, 12, 6, 6, 5, 5, 6, 4, 11, 5, 9, 2, 16, 7, 8] + [0] * 25,
-            'Receiving Tgt': [0] * 10 + [83, 33, 60, 44, 74, 75, 55, 69, 58, 76, 64, 30, 48, 57, 27, 171, 181, 164, 136, 107, 150, 175, 158, 97, 95, 130, 119, 136, 75, 95, 93, 61, 95, 65, 120, 114, 89, 90, 88, 81],
-            'Receiving Yds': [0] * 10 + [564, 214, 280, 296, 436, 466, 311, 238, 476, 591, 376, 233, 280, 345, 259, 1799, 1749, 1515, 1255, 1075, 1243, 1144, 1456, 1057, 737, 1051, 1122, 1016, 1057, 737, 984, 544, 960, 1020, 889, 1144, 882, 667, 635, 825],
-            'Receiving TD': [0] * 10 + [7, 0, 4, 1, 1, 5, 0, 4, 1, 4, 4, 1, 0, 5, 1, 13, 12, 10, 13, 8, 7, 8, 7, 5, 5, 4, 8, 8, 7, 5, 5, 6, 5, 6, 10, 4, 3, 3, 5, 3],
-            'Returns TD': [0] * 50,
-            'FUM Lost': [3, 4, 6, 3, 2, 2, 3, 4, 2, 1, 1, 2, 1, 1, 2, 1, 1, 1, 2, 1, 1, 1, 1, 1, 1, 0, 1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-        }
-        
-        df = pd.DataFrame(data)
-        df['Name'] = df['Name'].astype(str)
-        df['Team'] = df['Team'].astype(str)
-        df['Position'] = df['Position'].astype(str)
+        df = pd.DataFrame({
+            'Name': _SAMPLE_NAMES,
+            'Team': pd.Categorical(_SAMPLE_TEAMS),
+            'Position': pd.Categorical(_SAMPLE_POSITIONS),
+            'GP': _SAMPLE_GP,
+            'Passing Yds': _SAMPLE_PASSING_YDS,
+            'Passing TD': _SAMPLE_PASSING_TD,
+            'Passing Sks': _SAMPLE_PASSING_SKS,
+            'Rushing Yds': _SAMPLE_RUSHING_YDS,
+            'Rushing TD': _SAMPLE_RUSHING_TD,
+            'Receiving Tgt': _SAMPLE_RECEIVING_TGT,
+            'Receiving Yds': _SAMPLE_RECEIVING_YDS,
+            'Receiving TD': _SAMPLE_RECEIVING_TD,
+            'Returns TD': _SAMPLE_RETURNS_TD,
+            'FUM Lost': _SAMPLE_FUM_LOST
+        })
         
         return df
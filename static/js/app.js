@@ -6,6 +6,7 @@ let predictionsLoaded = false;
 let currentUser = null;
 let authToken = localStorage.getItem('auth_token');
 let currentDraftSessionId = null;
+let latestAIKey = null;
 
 // DOM Elements
 const loadDataBtn = document.getElementById('load-data-btn');
@@ -25,6 +26,15 @@ draftedPlayerInput.addEventListener('keypress', (e) => {
         addDraftedPlayer();
     }
 });
+// A draft position past the number of teams is rejected by the server
+document.getElementById('num-teams').addEventListener('change', (e) => {
+    const draftPositionInput = document.getElementById('draft-position');
+    const numTeams = parseInt(e.target.value) || 12;
+    draftPositionInput.max = numTeams;
+    if ((parseInt(draftPositionInput.value) || 1) > numTeams) {
+        draftPositionInput.value = numTeams;
+    }
+});
 
 // Load player predictions (auto-calculates for upcoming season)
 async function loadPlayerPredictions() {
@@ -123,9 +133,9 @@ async function getDraftRecommendations() {
                 currentDraftSessionId = data.session_id;
             }
             
-            // Display AI analysis if available (premium feature)
-            if (data.ai_analysis) {
-                displayAIAnalysis(data.ai_analysis);
+            // AI analysis is generated in the background (premium feature)
+            if (data.ai_pending && data.ai_key) {
+                pollAIAnalysis(data.ai_key);
             }
             
             showNotification('Draft recommendations updated!', 'success');
@@ -221,6 +231,46 @@ function displayAIAnalysis(analysis) {
     document.getElementById('ai-analysis-content').textContent = analysis;
 }
 
+// Poll for a background AI analysis until it is ready
+async function pollAIAnalysis(aiKey, attempts = 20) {
+    latestAIKey = aiKey;
+    
+    for (let i = 0; i < attempts; i++) {
+        await new Promise(resolve => setTimeout(resolve, 1500));
+        
+        // A newer pick started its own analysis
+        if (latestAIKey !== aiKey) {
+            return;
+        }
+        
+        try {
+            const response = await fetch(`/api/draft-assistant/ai/${aiKey}`, {
+                headers: {
+                    'Authorization': `Bearer ${authToken}`
+                }
+            });
+            const data = await response.json();
+            
+            if (!data.success) {
+                return;
+            }
+            if (data.analysis && latestAIKey === aiKey) {
+                displayAIAnalysis(data.analysis);
+            }
+            if (data.ready) {
+                // Generation failed partway; what is shown so far is cut off
+                if (data.complete === false && latestAIKey === aiKey) {
+                    showNotification(data.analysis ? 'AI analysis was interrupted and is incomplete' : 'AI analysis failed', 'error');
+                }
+                return;
+            }
+        } catch (error) {
+            console.error('Error getting AI analysis:', error);
+            return;
+        }
+    }
+}
+
 // Add drafted player
 function addDraftedPlayer() {
     const playerName = draftedPlayerInput.value.trim();
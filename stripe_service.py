@@ -1,17 +1,48 @@
 """
 Stripe service for payment processing
 """
+import logging
 import stripe
+import threading
+from collections import OrderedDict
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
 from typing import Optional, Dict
-from supabase_client import supabase_service
+from supabase_client import get_supabase_service
+
+log = logging.getLogger(__name__)
+
+# Marks a cache miss, since None (no user) is a cached answer too
+_MISSING = object()
 
 class StripeService:
     """Service class for Stripe operations"""
     
+    # How many recent webhook event ids to remember in memory
+    _MAX_SEEN_EVENTS = 4096
+    
+    # Seconds before each retry of an event that failed to apply; Stripe already has its 200,
+    # so it will not redeliver the event by itself
+    _RETRY_DELAYS = (5, 30, 120)
+    
     def __init__(self):
+        # Stripe customer id -> user id (or None), to skip a lookup per webhook
+        self._customer_user_ids = TTLCache(maxsize=1024, ttl=600)
+        self._user_id_cache_lock = threading.Lock()
+        
+        # Recently received webhook event ids (LRU), so Stripe's retries skip the database
+        self._seen_events = OrderedDict()
+        self._seen_events_lock = threading.Lock()
+        
+        # Verified webhook events are applied in the background
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        
         if Config.STRIPE_SECRET_KEY:
             stripe.api_key = Config.STRIPE_SECRET_KEY
+            stripe.default_http_client = stripe.http_client.RequestsClient(
+                session=Config.SHARED_REQUESTS_SESSION
+            )
             self.configured = True
         else:
             self.configured = False
@@ -46,7 +77,7 @@ class StripeService:
                 'url': checkout_session.url
             }
         except Exception as e:
-            print(f"Error creating checkout session: {e}")
+            log.warning("Error creating checkout session: %s", e)
             return None
     
     def create_customer_portal_session(self, customer_id: str, return_url: str = 'http://localhost:5000/dashboard') -> Optional[str]:
@@ -61,11 +92,11 @@ class StripeService:
             )
             return session.url
         except Exception as e:
-            print(f"Error creating portal session: {e}")
+            log.warning("Error creating portal session: %s", e)
             return None
     
     def handle_webhook(self, payload: bytes, sig_header: str) -> Optional[Dict]:
-        """Handle Stripe webhook events"""
+        """Verify a Stripe webhook and queue its processing; returns as soon as it is verified"""
         if not self.is_configured() or not Config.STRIPE_WEBHOOK_SECRET:
             return None
         
@@ -73,96 +104,178 @@ class StripeService:
             event = stripe.Webhook.construct_event(
                 payload, sig_header, Config.STRIPE_WEBHOOK_SECRET
             )
-            
-            # Handle the event
-            if event['type'] == 'checkout.session.completed':
-                session = event['data']['object']
-                user_id = session.get('metadata', {}).get('user_id')
-                customer_id = session.get('customer')
-                
-                # Update user profile with Stripe customer ID
-                if user_id and customer_id:
-                    supabase_service.update_user_profile(user_id, {
-                        'stripe_customer_id': customer_id,
-                        'subscription_tier': 'premium'
-                    })
-            
-            elif event['type'] == 'customer.subscription.created':
-                subscription = event['data']['object']
-                customer_id = subscription.get('customer')
-                
-                # Get user_id from customer metadata or lookup
-                customer = stripe.Customer.retrieve(customer_id)
-                user_id = customer.metadata.get('user_id')
-                
-                if user_id:
-                    supabase_service.create_subscription(
-                        user_id=user_id,
-                        stripe_subscription_id=subscription['id'],
-                        stripe_price_id=subscription['items']['data'][0]['price']['id'],
-                        status=subscription['status'],
-                        period_start=subscription['current_period_start'],
-                        period_end=subscription['current_period_end']
-                    )
-                    
-                    supabase_service.update_user_profile(user_id, {
-                        'subscription_tier': 'premium'
-                    })
-            
-            elif event['type'] == 'customer.subscription.updated':
-                subscription = event['data']['object']
-                updates = {
-                    'status': subscription['status'],
-                    'current_period_start': subscription['current_period_start'],
-                    'current_period_end': subscription['current_period_end'],
-                    'cancel_at_period_end': subscription.get('cancel_at_period_end', False)
-                }
-                
-                supabase_service.update_subscription(
-                    subscription['id'],
-                    updates
-                )
-                
-                # Update subscription tier if canceled or past_due
-                if subscription['status'] in ['canceled', 'past_due', 'incomplete']:
-                    # Get subscription to find user_id
-                    if supabase_service.is_configured():
-                        sub_data = supabase_service.client.table('subscriptions').select('user_id').eq('stripe_subscription_id', subscription['id']).execute()
-                        if sub_data.data and len(sub_data.data) > 0:
-                            user_id = sub_data.data[0]['user_id']
-                            supabase_service.update_user_profile(user_id, {
-                                'subscription_tier': 'free'
-                            })
-            
-            elif event['type'] == 'customer.subscription.deleted':
-                subscription = event['data']['object']
-                updates = {
-                    'status': 'canceled'
-                }
-                supabase_service.update_subscription(
-                    subscription['id'],
-                    updates
-                )
-                
-                # Update user tier to free
-                if supabase_service.is_configured():
-                    sub_data = supabase_service.client.table('subscriptions').select('user_id').eq('stripe_subscription_id', subscription['id']).execute()
-                    if sub_data.data and len(sub_data.data) > 0:
-                        user_id = sub_data.data[0]['user_id']
-                        supabase_service.update_user_profile(user_id, {
-                            'subscription_tier': 'free'
-                        })
-            
-            return {'status': 'success'}
         except ValueError as e:
-            print(f"Invalid payload: {e}")
+            log.warning("Invalid payload: %s", e)
             return None
         except stripe.error.SignatureVerificationError as e:
-            print(f"Invalid signature: {e}")
+            log.warning("Invalid signature: %s", e)
             return None
         except Exception as e:
-            print(f"Error handling webhook: {e}")
+            log.warning("Error handling webhook: %s", e)
             return None
+        
+        # Stripe delivers at least once; drop retries of an event seen recently
+        if self._is_duplicate_event(event.id):
+            return {'status': 'duplicate'}
+        
+        # Database writes happen off the request thread, so Stripe gets its 200 right away
+        self._executor.submit(self._process_event, event)
+        return {'status': 'received'}
+    
+    def _is_duplicate_event(self, event_id: str) -> bool:
+        """Remember an event id; returns True if it was received recently"""
+        with self._seen_events_lock:
+            if event_id in self._seen_events:
+                self._seen_events.move_to_end(event_id)
+                return True
+            self._seen_events[event_id] = None
+            if len(self._seen_events) > self._MAX_SEEN_EVENTS:
+                self._seen_events.popitem(last=False)
+            return False
+    
+    def _forget_event(self, event_id: str):
+        """Drop an event id that could not be applied, so a manual resend is not taken as a duplicate"""
+        with self._seen_events_lock:
+            self._seen_events.pop(event_id, None)
+    
+    def _process_event(self, event, attempt: int = 0):
+        """Apply a verified webhook event, once per event id, retrying it in the background on failure"""
+        supabase_service = get_supabase_service()
+        
+        # Every branch only writes to Supabase, so there is nothing to do without it
+        if not supabase_service.is_configured():
+            return
+        
+        try:
+            # Also check the table, which remembers events across restarts
+            if not supabase_service.record_webhook_event(event.id):
+                return
+            
+            try:
+                applied = self._apply_event(supabase_service, event)
+            except Exception as e:
+                log.warning("Error processing webhook event %s: %s", event.id, e)
+                applied = False
+            
+            # Release the id, so the retry below (or a resend) claims the event again
+            if not applied:
+                supabase_service.forget_webhook_event(event.id)
+                self._retry_event(event, attempt)
+        except Exception as e:
+            log.warning("Error processing webhook event %s: %s", event.id, e)
+            self._retry_event(event, attempt)
+    
+    def _retry_event(self, event, attempt: int):
+        """Schedule another attempt at an event that failed to apply, or give up on it"""
+        if attempt < len(self._RETRY_DELAYS):
+            delay = self._RETRY_DELAYS[attempt]
+            log.warning("Webhook event %s (%s) was not applied; retrying in %ss", event.id, event.type, delay)
+            timer = threading.Timer(delay, self._executor.submit, (self._process_event, event, attempt + 1))
+            timer.daemon = True
+            timer.start()
+            return
+        
+        # Out of retries: the event has to be resent from the Stripe Dashboard or CLI
+        log.error("Webhook event %s (%s) was not applied after %d attempts; resend it from Stripe to apply it",
+                  event.id, event.type, attempt + 1)
+        self._forget_event(event.id)
+    
+    def _apply_event(self, supabase_service, event) -> bool:
+        """Write a webhook event's changes to Supabase; False if any write failed"""
+        # Stripe objects allow attribute access; read each field once
+        event_type = event.type
+        obj = event.data.object
+        if event_type == 'checkout.session.completed':
+            user_id = (obj.get('metadata') or {}).get('user_id')
+            customer_id = obj.get('customer')
+            
+            # Update user profile with Stripe customer ID
+            if user_id and customer_id:
+                with self._user_id_cache_lock:
+                    self._customer_user_ids[customer_id] = user_id
+                return supabase_service.update_user_profile(user_id, {
+                    'stripe_customer_id': customer_id,
+                    'subscription_tier': 'premium'
+                })
+        
+        elif event_type == 'customer.subscription.created':
+            # Get user_id from the linked profile or customer metadata
+            user_id = self._get_user_id_for_customer(obj.customer)
+            if not user_id:
+                return False
+            
+            # 'items' has to be indexed: .items is the dict method
+            created = supabase_service.create_subscription(
+                user_id=user_id,
+                stripe_subscription_id=obj.id,
+                stripe_price_id=obj['items'].data[0].price.id,
+                status=obj.status,
+                period_start=obj.current_period_start,
+                period_end=obj.current_period_end
+            )
+            
+            return created and supabase_service.update_user_profile(user_id, {
+                'subscription_tier': 'premium'
+            })
+        
+        elif event_type == 'customer.subscription.updated':
+            status = obj.status
+            updates = {
+                'status': status,
+                'current_period_start': obj.current_period_start,
+                'current_period_end': obj.current_period_end,
+                'cancel_at_period_end': obj.get('cancel_at_period_end', False)
+            }
+            
+            # The updated row carries the user_id, so no separate lookup is needed
+            # (None means the update failed or matched no subscription)
+            user_id = supabase_service.update_subscription_and_get_user(
+                obj.id,
+                updates
+            )
+            if not user_id:
+                return False
+            
+            # Update subscription tier if canceled or past_due
+            if status in ['canceled', 'past_due', 'incomplete']:
+                return supabase_service.update_user_profile(user_id, {
+                    'subscription_tier': 'free'
+                })
+        
+        elif event_type == 'customer.subscription.deleted':
+            updates = {
+                'status': 'canceled'
+            }
+            user_id = supabase_service.update_subscription_and_get_user(
+                obj.id,
+                updates
+            )
+            if not user_id:
+                return False
+            
+            # Update user tier to free
+            return supabase_service.update_user_profile(user_id, {
+                'subscription_tier': 'free'
+            })
+        
+        return True
+    
+    def _get_user_id_for_customer(self, customer_id: str) -> Optional[str]:
+        """Map a Stripe customer to a user id: cache, then profiles table, then Stripe"""
+        with self._user_id_cache_lock:
+            user_id = self._customer_user_ids.get(customer_id, _MISSING)
+        if user_id is not _MISSING:
+            return user_id
+        
+        # The customer id is stored on the profile at checkout.session.completed
+        user_id = get_supabase_service().get_user_id_by_stripe_customer(customer_id)
+        if not user_id:
+            customer = stripe.Customer.retrieve(customer_id)
+            user_id = customer.metadata.get('user_id')
+        
+        with self._user_id_cache_lock:
+            self._customer_user_ids[customer_id] = user_id
+        return user_id
 
 # Global instance
 stripe_service = StripeService()
@@ -1,39 +1,246 @@
 """
 Supabase client and helper functions
 """
-from supabase import create_client, Client
+from supabase import Client
+from supabase.lib.client_options import ClientOptions
+from postgrest import SyncPostgrestClient
+from postgrest.exceptions import APIError
+from postgrest.types import CountMethod, ReturnMethod
+from postgrest.utils import SyncClient as PostgrestSession
+from storage3.utils import StorageException
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
 from typing import Optional, Dict, List
+import datetime
+import io
+import logging
+import threading
+import time
+import httpx
+import orjson
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from pyarrow import json as pa_json
+
+log = logging.getLogger(__name__)
+
+# What a failed PostgREST request raises (other errors are bugs and propagate)
+_REQUEST_ERRORS = (APIError, httpx.HTTPError)
+
+# Marks a cache miss, since None (no profile or no subscription) is a cached answer too
+_MISSING = object()
+
+# (season year, time it was read); the year is re-read from the clock at most hourly
+_current_season = (0, 0.0)
+
+def _current_season_year() -> int:
+    """Current season year, cached so cache reads do not query the clock each time"""
+    global _current_season
+    now = time.monotonic()
+    if now - _current_season[1] > 3600 or not _current_season[0]:
+        _current_season = (datetime.datetime.now().year, now)
+    return _current_season[0]
+
+class _PooledPostgrestClient(SyncPostgrestClient):
+    """PostgREST client whose session keeps idle connections warm for longer"""
+    
+    def create_session(self, base_url: str, headers: Dict[str, str], timeout) -> PostgrestSession:
+        return PostgrestSession(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=Config.SUPABASE_POOL_MAX,
+                max_keepalive_connections=min(20, Config.SUPABASE_POOL_MAX),
+                keepalive_expiry=30
+            )
+        )
+
+class _PooledClient(Client):
+    """Supabase client that builds its PostgREST client with the pooled session"""
+    
+    @staticmethod
+    def _init_postgrest_client(rest_url: str, headers: Dict[str, str], schema: str, timeout=None) -> SyncPostgrestClient:
+        return _PooledPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout)
+
+def _create_client(url: str, key: str) -> Client:
+    """Create a Supabase client with pooled REST connections and a short connect timeout"""
+    options = ClientOptions(postgrest_client_timeout=httpx.Timeout(5.0, connect=2.0))
+    return _PooledClient.create(supabase_url=url, supabase_key=key, options=options)
 
 class SupabaseService:
     """Service class for Supabase operations"""
     
+    # Upsert batches in flight at once (returns diminish beyond a handful)
+    _MAX_CONCURRENT_UPSERTS = 8
+    # User ids per in_() lookup, which keeps each request URL a sensible length
+    _IN_BATCH_SIZE = 100
+    # Profile columns the app reads (the timestamps are never used)
+    _PROFILE_COLUMNS = 'id,email,full_name,subscription_tier,stripe_customer_id'
+    # Columns each update may write; anything else is dropped so every update has one shape
+    _PROFILE_UPDATE_COLUMNS = frozenset({'email', 'full_name', 'subscription_tier', 'stripe_customer_id'})
+    _DRAFT_SESSION_UPDATE_COLUMNS = frozenset({'name', 'num_teams', 'draft_position', 'already_drafted'})
+    _SUBSCRIPTION_UPDATE_COLUMNS = frozenset({
+        'stripe_price_id', 'status', 'current_period_start', 'current_period_end', 'cancel_at_period_end'
+    })
+    
     def __init__(self):
         self.client: Optional[Client] = None
+        # Sends independent requests (such as upsert batches) concurrently
+        self._executor = ThreadPoolExecutor(max_workers=self._MAX_CONCURRENT_UPSERTS)
+        
+        # Per-user reads that rarely change, dropped whenever this service writes them
+        self._profile_cache = TTLCache(maxsize=10_000, ttl=60)
+        self._subscription_cache = TTLCache(maxsize=10_000, ttl=60)
+        self._premium_cache = TTLCache(maxsize=10_000, ttl=60)
+        self._user_cache_lock = threading.Lock()
+        
+        # Season -> decoded player DataFrame, dropped when that season is re-cached
+        self._players_cache = TTLCache(maxsize=4, ttl=900)
+        self._players_cache_lock = threading.Lock()
+        
+        # Set once Storage refuses the snapshot key, so later caches skip the snapshot
+        self._snapshot_denied = False
+        
         if Config.SUPABASE_URL and Config.SUPABASE_KEY:
-            self.client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+            self.client = _create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
         elif Config.SUPABASE_URL and Config.SUPABASE_SERVICE_KEY:
             # Use service key for server-side operations
-            self.client = create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+            self.client = _create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+        
+        # Server-only tables have RLS and no policies, so only the service role may write them
+        self.service_client: Optional[Client] = None
+        if Config.SUPABASE_URL and Config.SUPABASE_SERVICE_KEY:
+            if Config.SUPABASE_KEY:
+                self.service_client = _create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+            else:
+                self.service_client = self.client
+        elif self.client is not None:
+            log.warning("SUPABASE_SERVICE_KEY is not set: Stripe webhook events are not recorded in processed_webhook_events")
+    
+    def _snapshot_bucket(self):
+        """Storage bucket of the player snapshots; the service key can write it without a storage policy"""
+        return (self.service_client or self.client).storage.from_(Config.SUPABASE_CACHE_BUCKET)
+    
+    @staticmethod
+    def _is_storage_denied(error: Exception) -> bool:
+        """Whether Storage rejected a request for lack of permission (401/403 or an RLS violation)"""
+        if not isinstance(error, StorageException) or not error.args or not isinstance(error.args[0], dict):
+            return False
+        details = error.args[0]
+        return str(details.get('statusCode')) in ('401', '403') or details.get('error') == 'Unauthorized'
     
     def is_configured(self) -> bool:
         """Check if Supabase is configured"""
         return self.client is not None
     
+    @staticmethod
+    def _only(updates: Dict, columns: frozenset) -> Dict:
+        """Keep only the updatable columns of an update"""
+        return {column: value for column, value in updates.items() if column in columns}
+    
+    def _get_cached(self, cache: TTLCache, user_id: str):
+        """Read a per-user cache; returns _MISSING on a miss"""
+        with self._user_cache_lock:
+            return cache.get(user_id, _MISSING)
+    
+    def _set_cached(self, cache: TTLCache, user_id: str, value):
+        """Store a per-user cache entry"""
+        with self._user_cache_lock:
+            cache[user_id] = value
+    
+    def _get_many_cached(self, cache: TTLCache, user_ids: List[str], fetch, key: str, error_message: str,
+                         to_value=lambda row: row, default=None) -> Dict:
+        """Read a per-user cache for many users, fetching the misses in batched, concurrent requests"""
+        results = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            value = self._get_cached(cache, user_id)
+            if value is _MISSING:
+                missing.append(user_id)
+            else:
+                results[user_id] = value
+        if not missing:
+            return results
+        
+        try:
+            batches = [missing[start:start + self._IN_BATCH_SIZE] for start in range(0, len(missing), self._IN_BATCH_SIZE)]
+            if len(batches) == 1:
+                rows = fetch(missing)
+            else:
+                # The PostgREST client is set up here first, since it is created lazily
+                self.client.postgrest
+                rows = [row for batch_rows in self._executor.map(fetch, batches) for row in batch_rows]
+            fetched = {row[key]: to_value(row) for row in rows}
+        except _REQUEST_ERRORS as e:
+            log.warning(error_message, e)
+            return results
+        
+        for user_id in missing:
+            results[user_id] = fetched.get(user_id, default)
+            self._set_cached(cache, user_id, results[user_id])
+        return results
+    
+    def _invalidate_user(self, user_id: str = None, profile: bool = False, subscription: bool = False):
+        """Drop cached reads for a user (all users if user_id is None) after a write"""
+        caches = [self._premium_cache]
+        if profile:
+            caches.append(self._profile_cache)
+        if subscription:
+            caches.append(self._subscription_cache)
+        with self._user_cache_lock:
+            for cache in caches:
+                if user_id is None:
+                    cache.clear()
+                else:
+                    cache.pop(user_id, None)
+    
     # Profile operations
     def get_user_profile(self, user_id: str) -> Optional[Dict]:
         """Get user profile"""
         if not self.is_configured():
             return None
         
+        profile = self._get_cached(self._profile_cache, user_id)
+        if profile is not _MISSING:
+            return profile
+        
+        try:
+            # maybe_single asks for one object (not an array) and returns None for no row
+            response = self.client.table('profiles').select(self._PROFILE_COLUMNS).eq('id', user_id).maybe_single().execute()
+            profile = response.data if response else None
+        except _REQUEST_ERRORS as e:
+            log.warning("Error getting user profile: %s", e)
+            return None
+        
+        self._set_cached(self._profile_cache, user_id, profile)
+        return profile
+    
+    def get_user_profiles(self, user_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """Get many user profiles in one request, keyed by user id (None if missing)"""
+        if not self.is_configured():
+            return {}
+        
+        return self._get_many_cached(
+            self._profile_cache, user_ids,
+            lambda missing: self.client.table('profiles').select(self._PROFILE_COLUMNS).in_('id', missing).execute().data,
+            'id', "Error getting user profiles: %s"
+        )
+    
+    def get_user_id_by_stripe_customer(self, stripe_customer_id: str) -> Optional[str]:
+        """Get the id of the user whose profile is linked to a Stripe customer"""
+        if not self.is_configured():
+            return None
+        
         try:
-            response = self.client.table('profiles').select('*').eq('id', user_id).execute()
+            response = self.client.table('profiles').select('id').eq('stripe_customer_id', stripe_customer_id).limit(1).execute()
             if response.data:
-                return response.data[0]
+                return response.data[0]['id']
             return None
-        except Exception as e:
-            print(f"Error getting user profile: {e}")
+        except _REQUEST_ERRORS as e:
+            log.warning("Error getting user by Stripe customer: %s", e)
             return None
     
     def update_user_profile(self, user_id: str, updates: Dict) -> bool:
@@ -42,10 +249,12 @@ class SupabaseService:
             return False
         
         try:
-            self.client.table('profiles').update(updates).eq('id', user_id).execute()
+            # return=minimal: the updated row is not sent back
+            self.client.table('profiles').update(self._only(updates, self._PROFILE_UPDATE_COLUMNS), returning=ReturnMethod.minimal).eq('id', user_id).execute()
+            self._invalidate_user(user_id, profile=True)
             return True
-        except Exception as e:
-            print(f"Error updating user profile: {e}")
+        except _REQUEST_ERRORS as e:
+            log.warning("Error updating user profile: %s", e)
             return False
     
     # Draft session operations
@@ -62,24 +271,29 @@ class SupabaseService:
                 'draft_position': draft_position,
                 'already_drafted': already_drafted or []
             }
-            response = self.client.table('draft_sessions').insert(data).execute()
+            # The inserted row comes back in the same request (return=representation);
+            # select=id trims it to the one column needed
+            query = self.client.table('draft_sessions').insert(data)
+            query.params = query.params.add('select', 'id')
+            response = query.execute()
             if response.data:
                 return response.data[0]['id']
             return None
-        except Exception as e:
-            print(f"Error creating draft session: {e}")
+        except _REQUEST_ERRORS as e:
+            log.warning("Error creating draft session: %s", e)
             return None
     
-    def get_user_draft_sessions(self, user_id: str) -> List[Dict]:
-        """Get all draft sessions for a user"""
+    def get_user_draft_sessions(self, user_id: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """Get a page of a user's draft sessions, newest first"""
         if not self.is_configured():
             return []
         
         try:
-            response = self.client.table('draft_sessions').select('*').eq('user_id', user_id).order('created_at', desc=True).execute()
+            # List-view columns only, served by the (user_id, created_at DESC) index
+            response = self.client.table('draft_sessions').select('id,name,num_teams,draft_position,created_at').eq('user_id', user_id).order('created_at', desc=True).range(offset, offset + limit - 1).execute()
             return response.data if response.data else []
-        except Exception as e:
-            print(f"Error getting draft sessions: {e}")
+        except _REQUEST_ERRORS as e:
+            log.warning("Error getting draft sessions: %s", e)
             return []
     
     def update_draft_session(self, session_id: str, user_id: str, updates: Dict) -> bool:
@@ -88,81 +302,208 @@ class SupabaseService:
             return False
         
         try:
-            self.client.table('draft_sessions').update(updates).eq('id', session_id).eq('user_id', user_id).execute()
+            self.client.table('draft_sessions').update(self._only(updates, self._DRAFT_SESSION_UPDATE_COLUMNS), returning=ReturnMethod.minimal).eq('id', session_id).eq('user_id', user_id).execute()
             return True
-        except Exception as e:
-            print(f"Error updating draft session: {e}")
+        except _REQUEST_ERRORS as e:
+            log.warning("Error updating draft session: %s", e)
             return False
     
     def delete_draft_session(self, session_id: str, user_id: str) -> bool:
-        """Delete a draft session"""
+        """Delete a draft session; False if no session of this user's matched"""
         if not self.is_configured():
             return False
         
         try:
-            self.client.table('draft_sessions').delete().eq('id', session_id).eq('user_id', user_id).execute()
-            return True
-        except Exception as e:
-            print(f"Error deleting draft session: {e}")
+            # The affected-row count comes back with the delete, so no follow-up select is
+            # needed (postgrest-py loses the count on an empty return=minimal body, hence
+            # select=id rather than minimal)
+            query = self.client.table('draft_sessions').delete(count=CountMethod.exact).eq('id', session_id).eq('user_id', user_id)
+            query.params = query.params.add('select', 'id')
+            response = query.execute()
+            return (response.count or 0) > 0
+        except _REQUEST_ERRORS as e:
+            log.warning("Error deleting draft session: %s", e)
             return False
     
     # Player cache operations
-    def cache_players(self, players_df: pd.DataFrame, season_year: int = None) -> bool:
+    def cache_players(self, players_df: pd.DataFrame, season_year: int = None, batch_size: int = None) -> bool:
         """Cache player data to Supabase"""
         if not self.is_configured():
             return False
         
         try:
-            import datetime
             if season_year is None:
-                season_year = datetime.datetime.now().year
+                season_year = _current_season_year()
+            
+            # Send the batches column by column: one list per player_cache column, and the
+            # stats rows as JSON written by pandas in C, so no dict is built per player
+            def column(name, default, dtype=None):
+                if name not in players_df.columns:
+                    return [default] * len(players_df)
+                values = players_df[name]
+                return (values if dtype is None else values.astype(dtype)).tolist()
+            
+            fantasy_points = column('Fantasy Points', 0.0, float)
+            predicted_points = column('Predicted Points', None, float)
+            if 'Predicted Points' not in players_df.columns:
+                predicted_points = fantasy_points
+            columns = {
+                'p_names': column('Name', ''),
+                'p_teams': column('Team', ''),
+                'p_positions': column('Position', ''),
+                'p_fantasy_points': fantasy_points,
+                'p_predicted_points': predicted_points
+            }
             
-            players_data = []
-            for _, row in players_df.iterrows():
-                player_data = {
-                    'player_name': row.get('Name', ''),
-                    'team': row.get('Team', ''),
-                    'position': row.get('Position', ''),
-                    'stats': row.to_dict(),
-                    'fantasy_points': float(row.get('Fantasy Points', 0)),
-                    'predicted_points': float(row.get('Predicted Points', row.get('Fantasy Points', 0))),
-                    'season_year': season_year
-                }
-                players_data.append(player_data)
+            # Upsert players (insert or update if exists), in batches that keep each
+            # request small enough to avoid timeouts; the batches are sent concurrently
+            # so the total wait is about the slowest batch rather than their sum
+            # (the session is fetched here, since the client sets itself up lazily)
+            session = self.client.postgrest.session
+            size = max(1, batch_size or Config.CACHE_BATCH_SIZE)
+            pending = []
+            for start in range(0, len(players_df), size):
+                batch = {name: values[start:start + size] for name, values in columns.items()}
+                batch['p_season_year'] = season_year
+                batch['p_stats'] = orjson.Fragment(
+                    players_df.iloc[start:start + size].to_json(orient='records', double_precision=15)
+                )
+                pending.append(self._executor.submit(self._upsert_players_batch, session, batch))
             
-            # Upsert players (insert or update if exists)
-            self.client.table('player_cache').upsert(players_data, on_conflict='player_name,season_year').execute()
+            # Meanwhile store the whole frame as one Parquet object for fast bulk reads
+            # (a single request however many players there are)
+            self._upload_players_snapshot(players_df, season_year)
+            for future in pending:
+                future.result()
+            with self._players_cache_lock:
+                self._players_cache.pop(season_year, None)
             return True
         except Exception as e:
-            print(f"Error caching players: {e}")
+            log.warning("Error caching players: %s", e)
             return False
     
+    def _upsert_players_batch(self, session: httpx.Client, batch: Dict):
+        """Upsert one batch of player_cache rows through the bulk_upsert_players function"""
+        # One set-based INSERT ... ON CONFLICT on the server; the body is encoded by orjson
+        # (in C, NaN becomes null) rather than stdlib json
+        response = session.post(
+            '/rpc/bulk_upsert_players',
+            content=orjson.dumps(batch, option=orjson.OPT_SERIALIZE_NUMPY),
+            headers={'Content-Type': 'application/json'}
+        )
+        response.raise_for_status()
+    
     def get_cached_players(self, season_year: int = None) -> Optional[pd.DataFrame]:
         """Get cached player data from Supabase"""
         if not self.is_configured():
             return None
         
         try:
-            import datetime
             if season_year is None:
-                season_year = datetime.datetime.now().year
-            
-            response = self.client.table('player_cache').select('*').eq('season_year', season_year).execute()
+                season_year = _current_season_year()
             
-            if not response.data:
-                return None
+            # Memory first, then the Parquet snapshot, then the rows
+            with self._players_cache_lock:
+                players_df = self._players_cache.get(season_year)
+            if players_df is None:
+                players_df = self._load_cached_players(season_year)
+                if players_df is None:
+                    return None
+                with self._players_cache_lock:
+                    self._players_cache[season_year] = players_df
             
-            # Convert to DataFrame
-            players_list = []
-            for item in response.data:
-                stats = item.get('stats', {})
-                stats['Fantasy Points'] = item.get('fantasy_points', 0)
-                stats['Predicted Points'] = item.get('predicted_points', 0)
-                players_list.append(stats)
-            
-            return pd.DataFrame(players_list) if players_list else None
+            # Shallow copy, so callers adding columns do not change the cached frame
+            return players_df.copy(deep=False)
+        except Exception as e:
+            log.warning("Error getting cached players: %s", e)
+            return None
+    
+    def _load_cached_players(self, season_year: int) -> Optional[pd.DataFrame]:
+        """Fetch a season's cached players from Supabase Storage or the player_cache table"""
+        # Prefer the Parquet snapshot: one download, decoded column-wise by pyarrow
+        snapshot_df = self._download_players_snapshot(season_year)
+        if snapshot_df is not None and len(snapshot_df) > 0:
+            return snapshot_df
+        
+        return self._read_player_rows(season_year)
+    
+    def _read_player_rows(self, season_year: int) -> Optional[pd.DataFrame]:
+        """Read a season's player_cache rows as CSV and decode them column-wise with pyarrow"""
+        # v_player_cache merges the point columns into the stats object on the server,
+        # so each CSV row is one complete player object
+        response = self.client.postgrest.session.get(
+            '/v_player_cache',
+            params={'select': 'player', 'season_year': f'eq.{season_year}'},
+            headers={'Accept': 'text/csv'}
+        )
+        response.raise_for_status()
+        if not response.content.strip():
+            return None
+        rows = pa_csv.read_csv(
+            io.BytesIO(response.content),
+            convert_options=pa_csv.ConvertOptions(column_types={'player': pa.string()})
+        )
+        if rows.num_rows == 0:
+            return None
+        
+        # The player objects, one per line, parsed in C (the whole body as one block so
+        # column types are inferred from every row)
+        player_lines = '\n'.join(rows.column('player').to_pylist()).encode()
+        try:
+            return pa_json.read_json(
+                io.BytesIO(player_lines), read_options=pa_json.ReadOptions(block_size=len(player_lines) + 1)
+            ).to_pandas()
+        except pa.ArrowInvalid:
+            # A column mixing numbers and text: build the frame from the parsed rows instead
+            return pd.DataFrame([orjson.loads(line) for line in player_lines.splitlines()])
+    
+    def _players_snapshot_path(self, season_year: int) -> str:
+        """Storage path of the Parquet player snapshot for a season"""
+        return f'players/{season_year}.parquet'
+    
+    def _upload_players_snapshot(self, players_df: pd.DataFrame, season_year: int) -> bool:
+        """Upload the player frame to Supabase Storage as a single Parquet object"""
+        if self._snapshot_denied:
+            return False
+        
+        path = self._players_snapshot_path(season_year)
+        bucket = self._snapshot_bucket()
+        
+        try:
+            buffer = io.BytesIO()
+            players_df.to_parquet(buffer, engine='pyarrow', compression='zstd', index=False)
+            bucket.upload(path, buffer.getvalue(), file_options={
+                'content-type': 'application/octet-stream',
+                'upsert': 'true'
+            })
+            return True
+        except Exception as e:
+            if self._is_storage_denied(e):
+                # Retrying each cache would only fail again; the player_cache rows still serve reads
+                log.warning("Storage refused the player snapshot (set SUPABASE_SERVICE_KEY or add a storage policy); snapshots are off: %s", e)
+                self._snapshot_denied = True
+                return False
+            log.warning("Error uploading player snapshot: %s", e)
+            # Do not leave an older snapshot in front of the freshly upserted rows
+            try:
+                bucket.remove([path])
+            except Exception:
+                pass
+            return False
+    
+    def _download_players_snapshot(self, season_year: int) -> Optional[pd.DataFrame]:
+        """Download and decode the Parquet player snapshot, if there is one"""
+        # Without uploads any snapshot left behind would be older than the rows
+        if self._snapshot_denied:
+            return None
+        
+        try:
+            data = self._snapshot_bucket().download(
+                self._players_snapshot_path(season_year)
+            )
+            return pd.read_parquet(io.BytesIO(data), engine='pyarrow')
         except Exception as e:
-            print(f"Error getting cached players: {e}")
+            log.warning("Error downloading player snapshot: %s", e)
             return None
     
     # Subscription operations
@@ -171,25 +512,80 @@ class SupabaseService:
         if not self.is_configured():
             return None
         
+        subscription = self._get_cached(self._subscription_cache, user_id)
+        if subscription is not _MISSING:
+            return subscription
+        
         try:
-            response = self.client.table('subscriptions').select('*').eq('user_id', user_id).eq('status', 'active').execute()
-            if response.data:
-                return response.data[0]
-            return None
-        except Exception as e:
-            print(f"Error getting subscription: {e}")
+            response = self.client.table('subscriptions').select('*').eq('user_id', user_id).eq('status', 'active').limit(1).maybe_single().execute()
+            subscription = response.data if response else None
+        except _REQUEST_ERRORS as e:
+            log.warning("Error getting subscription: %s", e)
             return None
+        
+        self._set_cached(self._subscription_cache, user_id, subscription)
+        return subscription
+    
+    def get_user_subscriptions(self, user_ids: List[str]) -> Dict[str, Optional[Dict]]:
+        """Get many users' active subscriptions in one request, keyed by user id (None if none)"""
+        if not self.is_configured():
+            return {}
+        
+        return self._get_many_cached(
+            self._subscription_cache, user_ids,
+            lambda missing: self.client.table('subscriptions').select('*').in_('user_id', missing).eq('status', 'active').execute().data,
+            'user_id', "Error getting subscriptions: %s"
+        )
     
     def is_user_premium(self, user_id: str) -> bool:
         """Check if user has premium subscription"""
         if not self.is_configured():
             return False
         
-        profile = self.get_user_profile(user_id)
-        if profile and profile.get('subscription_tier') == 'premium':
-            subscription = self.get_user_subscription(user_id)
-            return subscription is not None
-        return False
+        is_premium = self._get_cached(self._premium_cache, user_id)
+        if is_premium is not _MISSING:
+            return is_premium
+        
+        try:
+            # One round trip: a premium profile joined (inner) to an active subscription
+            response = (
+                self.client.table('profiles')
+                .select('id', 'subscriptions!inner(status)')
+                .eq('id', user_id)
+                .eq('subscription_tier', 'premium')
+                .eq('subscriptions.status', 'active')
+                .limit(1)
+                .execute()
+            )
+            is_premium = bool(response.data)
+        except _REQUEST_ERRORS as e:
+            log.warning("Error checking premium status: %s", e)
+            return False
+        
+        self._set_cached(self._premium_cache, user_id, is_premium)
+        return is_premium
+    
+    def is_user_premium_bulk(self, user_ids: List[str]) -> Dict[str, bool]:
+        """Check many users' premium status in one request, keyed by user id"""
+        if not self.is_configured():
+            return {user_id: False for user_id in user_ids}
+        
+        # Same embedded query as is_user_premium, for every uncached user at once
+        rows = self._get_many_cached(
+            self._premium_cache, user_ids,
+            lambda missing: (
+                self.client.table('profiles')
+                .select('id', 'subscriptions!inner(status)')
+                .in_('id', missing)
+                .eq('subscription_tier', 'premium')
+                .eq('subscriptions.status', 'active')
+                .execute()
+                .data
+            ),
+            'id', "Error checking premium status: %s",
+            to_value=lambda row: True, default=False
+        )
+        return {user_id: bool(rows.get(user_id)) for user_id in user_ids}
     
     def update_subscription(self, stripe_subscription_id: str, updates: Dict) -> bool:
         """Update subscription based on Stripe webhook"""
@@ -197,12 +593,34 @@ class SupabaseService:
             return False
         
         try:
-            self.client.table('subscriptions').update(updates).eq('stripe_subscription_id', stripe_subscription_id).execute()
+            self.client.table('subscriptions').update(self._only(updates, self._SUBSCRIPTION_UPDATE_COLUMNS), returning=ReturnMethod.minimal).eq('stripe_subscription_id', stripe_subscription_id).execute()
+            # The owner is not known here, so drop every cached subscription read
+            self._invalidate_user(subscription=True)
             return True
-        except Exception as e:
-            print(f"Error updating subscription: {e}")
+        except _REQUEST_ERRORS as e:
+            log.warning("Error updating subscription: %s", e)
             return False
     
+    def update_subscription_and_get_user(self, stripe_subscription_id: str, updates: Dict) -> Optional[str]:
+        """Update a subscription and return its user id from the updated row, in one round trip"""
+        if not self.is_configured():
+            return None
+        
+        try:
+            # PostgREST returns the updated rows (Prefer: return=representation);
+            # select=user_id trims them to the one column needed
+            query = self.client.table('subscriptions').update(self._only(updates, self._SUBSCRIPTION_UPDATE_COLUMNS)).eq('stripe_subscription_id', stripe_subscription_id)
+            query.params = query.params.add('select', 'user_id')
+            response = query.execute()
+            if response.data:
+                user_id = response.data[0]['user_id']
+                self._invalidate_user(user_id, subscription=True)
+                return user_id
+            return None
+        except _REQUEST_ERRORS as e:
+            log.warning("Error updating subscription: %s", e)
+            return None
+    
     def create_subscription(self, user_id: str, stripe_subscription_id: str, stripe_price_id: str, status: str, period_start, period_end) -> bool:
         """Create a new subscription record"""
         if not self.is_configured():
@@ -217,12 +635,58 @@ class SupabaseService:
                 'current_period_start': period_start.isoformat() if hasattr(period_start, 'isoformat') else str(period_start),
                 'current_period_end': period_end.isoformat() if hasattr(period_end, 'isoformat') else str(period_end)
             }
-            self.client.table('subscriptions').insert(data).execute()
+            # Nothing is read back, so do not have the row sent back either
+            self.client.table('subscriptions').insert(data, returning=ReturnMethod.minimal).execute()
+            self._invalidate_user(user_id, subscription=True)
             return True
-        except Exception as e:
-            print(f"Error creating subscription: {e}")
+        except _REQUEST_ERRORS as e:
+            log.warning("Error creating subscription: %s", e)
+            return False
+    
+    # Webhook operations
+    def record_webhook_event(self, event_id: str) -> bool:
+        """Record a webhook event as processed (needs the service key); returns False if it already was"""
+        if self.service_client is None:
+            return True
+        
+        try:
+            # ON CONFLICT DO NOTHING: only a newly inserted row comes back
+            response = self.service_client.table('processed_webhook_events').upsert(
+                {'event_id': event_id}, on_conflict='event_id', ignore_duplicates=True
+            ).execute()
+            return bool(response.data)
+        except _REQUEST_ERRORS as e:
+            log.warning("Error recording webhook event: %s", e)
+            return True
+    
+    def forget_webhook_event(self, event_id: str) -> bool:
+        """Remove a webhook event's record, so a redelivery is processed again"""
+        if self.service_client is None:
             return False
+        
+        try:
+            self.service_client.table('processed_webhook_events').delete(returning=ReturnMethod.minimal).eq('event_id', event_id).execute()
+            return True
+        except _REQUEST_ERRORS as e:
+            log.warning("Error forgetting webhook event: %s", e)
+            return False
+
+# Global instance, created on first use (creating the client sets up HTTP clients)
+_supabase_service: Optional[SupabaseService] = None
+_supabase_service_lock = threading.Lock()
+
+def get_supabase_service() -> SupabaseService:
+    """The shared SupabaseService, created on first call"""
+    global _supabase_service
+    if _supabase_service is None:
+        with _supabase_service_lock:
+            if _supabase_service is None:
+                _supabase_service = SupabaseService()
+    return _supabase_service
 
-# Global instance
-supabase_service = SupabaseService()
+def __getattr__(name: str):
+    """Keep `from supabase_client import supabase_service` working (PEP 562)"""
+    if name == 'supabase_service':
+        return get_supabase_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
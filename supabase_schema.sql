@@ -55,9 +55,22 @@ CREATE TABLE IF NOT EXISTS public.subscriptions (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Processed Stripe webhook events (so retried deliveries are only applied once)
+CREATE TABLE IF NOT EXISTS public.processed_webhook_events (
+    event_id TEXT PRIMARY KEY,
+    processed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Cached players with the point columns merged into each stats object, one flat object per row
+CREATE OR REPLACE VIEW public.v_player_cache AS
+    SELECT season_year,
+           stats || jsonb_build_object('Fantasy Points', fantasy_points, 'Predicted Points', predicted_points) AS player
+    FROM public.player_cache;
+
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_draft_sessions_user_id ON public.draft_sessions(user_id);
 CREATE INDEX IF NOT EXISTS idx_draft_sessions_created_at ON public.draft_sessions(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_draft_sessions_user_created ON public.draft_sessions(user_id, created_at DESC) INCLUDE (name, num_teams, draft_position);
 CREATE INDEX IF NOT EXISTS idx_player_cache_player_name ON public.player_cache(player_name);
 CREATE INDEX IF NOT EXISTS idx_player_cache_season_year ON public.player_cache(season_year);
 CREATE INDEX IF NOT EXISTS idx_subscriptions_user_id ON public.subscriptions(user_id);
@@ -67,6 +80,8 @@ CREATE INDEX IF NOT EXISTS idx_subscriptions_stripe_subscription_id ON public.su
 ALTER TABLE public.profiles ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.draft_sessions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.subscriptions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.processed_webhook_events ENABLE ROW LEVEL SECURITY;
+-- No policies on purpose: only the service role (SUPABASE_SERVICE_KEY) reads or writes webhook events
 
 -- RLS Policies for profiles
 CREATE POLICY "Users can view own profile" ON public.profiles
@@ -117,6 +132,47 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Set-based upsert of a batch of cached players (one statement instead of PostgREST's per-row upsert).
+-- The batch arrives column by column; stats is a JSON array with one object per player.
+-- ROWS FROM numbers the columns together, and columns of different lengths are rejected
+-- rather than padded or dropped.
+CREATE OR REPLACE FUNCTION public.bulk_upsert_players(
+    p_season_year INTEGER,
+    p_names TEXT[],
+    p_teams TEXT[],
+    p_positions TEXT[],
+    p_fantasy_points NUMERIC[],
+    p_predicted_points NUMERIC[],
+    p_stats JSONB
+)
+RETURNS VOID AS $$
+DECLARE
+    player_count INTEGER := COALESCE(cardinality(p_names), 0);
+BEGIN
+    IF COALESCE(cardinality(p_teams), 0) <> player_count
+        OR COALESCE(cardinality(p_positions), 0) <> player_count
+        OR COALESCE(cardinality(p_fantasy_points), 0) <> player_count
+        OR COALESCE(cardinality(p_predicted_points), 0) <> player_count
+        OR COALESCE(jsonb_array_length(p_stats), 0) <> player_count THEN
+        RAISE EXCEPTION 'bulk_upsert_players: column lengths differ (% names)', player_count;
+    END IF;
+    
+    INSERT INTO public.player_cache (player_name, team, position, stats, fantasy_points, predicted_points, season_year)
+    SELECT p.player_name, p.team, p.position, p.stats, p.fantasy_points, p.predicted_points, p_season_year
+    FROM ROWS FROM (
+            unnest(p_names), unnest(p_teams), unnest(p_positions), unnest(p_fantasy_points),
+            unnest(p_predicted_points), jsonb_array_elements(p_stats)
+        ) WITH ORDINALITY AS p(player_name, team, position, fantasy_points, predicted_points, stats, n)
+    ON CONFLICT (player_name, season_year) DO UPDATE SET
+        team = EXCLUDED.team,
+        position = EXCLUDED.position,
+        stats = EXCLUDED.stats,
+        fantasy_points = EXCLUDED.fantasy_points,
+        predicted_points = EXCLUDED.predicted_points,
+        cached_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
 -- Triggers to update updated_at
 CREATE TRIGGER update_profiles_updated_at BEFORE UPDATE ON public.profiles
     FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();